@@ -0,0 +1,174 @@
+"""
+Quadratically (and quartically) convergent pi algorithms from the "Modern
+Algorithm Era" of PiTimelines, as an alternative to the Chudnovsky series
+in pidigits.py.
+
+    gauss_legendre  AGM iteration, doubles the correct digits every step
+    borwein_quartic Borwein brothers' 1985 iteration, quadruples them
+
+Everything runs in binary fixed point on Python ints. All big products go
+through `mul`, so a faster multiplier can be plugged in; square roots and
+divisions are Newton iterations built on it.
+"""
+import math
+import operator
+
+LOG10_2 = math.log10(2)
+
+# Extra bits carried beyond the requested precision
+GUARD_BITS = 64
+
+# Below this precision (bits) Newton starts from an exact integer result
+BASE_PRECISION = 2000
+
+
+def _reciprocal(x, prec, mul):
+    # 2**prec / X for the fixed-point value X = x / 2**prec
+    if prec <= BASE_PRECISION:
+        return (1 << 2 * prec) // x
+    half = prec // 2 + 16
+    z = _reciprocal(x >> (prec - half), half, mul) << (prec - half)
+    e = (1 << prec) - (mul(x, z) >> prec)
+    return z + (mul(z, e) >> prec)
+
+
+def _rsqrt(x, prec, mul):
+    # 2**prec / sqrt(X) for the fixed-point value X = x / 2**prec
+    if prec <= BASE_PRECISION:
+        return math.isqrt((1 << 3 * prec) // x)
+    half = prec // 2 + 16
+    y = _rsqrt(x >> (prec - half), half, mul) << (prec - half)
+    y2 = mul(y, y) >> prec
+    e = (1 << prec) - (mul(x, y2) >> prec)
+    return y + (mul(y, e) >> (prec + 1))
+
+
+def _sqrt(x, prec, mul):
+    return mul(x, _rsqrt(x, prec, mul)) >> prec
+
+
+def _digits_from_error(log10_error, n):
+    # Correct decimal digits implied by an error bound, capped at the target
+    return max(0, min(n, int(-log10_error)))
+
+
+def gauss_legendre(n, mul=None, callback=None):
+    """
+    Return floor(pi * 10**n) by the Gauss–Legendre AGM iteration.
+
+    callback(iteration, digits) is called after every iteration with the
+    number of digits guaranteed by the error bound
+    pi - pi_k < pi**2 2**(k+4) exp(-pi 2**(k+1)) / AGM(1, 1/sqrt 2)**2.
+    """
+    mul = mul or operator.mul
+    prec = int(n / LOG10_2) + GUARD_BITS
+    one = 1 << prec
+
+    a = one
+    b = _rsqrt(2 * one, prec, mul)
+    t = one >> 2
+    p = 1
+    agm2 = 0.8472130847939790 ** 2
+
+    k = 0
+    while True:
+        a_next = (a + b) >> 1
+        b = _sqrt(mul(a, b) >> prec, prec, mul)
+        d = a - a_next
+        t -= p * (mul(d, d) >> prec)
+        a = a_next
+        p <<= 1
+
+        log10_error = (
+            math.log10(math.pi ** 2 / agm2) + (k + 5) * LOG10_2
+            - math.pi * 2 ** (k + 2) * math.log10(math.e)
+        )
+        correct = _digits_from_error(log10_error, n)
+        if callback is not None:
+            callback(k + 1, correct)
+        k += 1
+        if correct >= n:
+            break
+
+    s = a + b
+    pi = mul(mul(s, s) >> prec, _reciprocal(4 * t, prec, mul)) >> prec
+    return (pi * 10 ** n) >> prec
+
+
+def borwein_quartic(n, mul=None, callback=None):
+    """
+    Return floor(pi * 10**n) by the Borweins' quartic iteration.
+
+    callback(iteration, digits) is called after every iteration with the
+    number of digits guaranteed by the error bound
+    1/a_k - pi < 16 * 4**k * pi**2 * exp(-2 pi 4**k).
+    """
+    mul = mul or operator.mul
+    prec = int(n / LOG10_2) + GUARD_BITS
+    one = 1 << prec
+
+    sqrt2 = _sqrt(2 * one, prec, mul)
+    a = 6 * one - 4 * sqrt2
+    y = sqrt2 - one
+
+    k = 0
+    while True:
+        y2 = mul(y, y) >> prec
+        y4 = mul(y2, y2) >> prec
+        r = _sqrt(_sqrt(one - y4, prec, mul), prec, mul)
+        y = mul(one - r, _reciprocal(one + r, prec, mul)) >> prec
+
+        y_plus = one + y
+        y_plus2 = mul(y_plus, y_plus) >> prec
+        y_plus4 = mul(y_plus2, y_plus2) >> prec
+        a = (mul(a, y_plus4) >> prec) - (mul(y, one + y + (mul(y, y) >> prec)) >> (prec - 2 * k - 3))
+
+        log10_error = (
+            math.log10(16 * math.pi ** 2) + (k + 1) * math.log10(4)
+            - 2 * math.pi * 4 ** (k + 1) * math.log10(math.e)
+        )
+        correct = _digits_from_error(log10_error, n)
+        if callback is not None:
+            callback(k + 1, correct)
+        k += 1
+        if correct >= n:
+            break
+
+    pi = _reciprocal(a, prec, mul)
+    return (pi * 10 ** n) >> prec
+
+
+METHODS = {
+    "gauss-legendre": gauss_legendre,
+    "borwein": borwein_quartic,
+}
+
+
+def benchmark(sizes):
+    """Time the AGM iterations against the Chudnovsky series on the same digit counts."""
+    import time
+
+    import pidigits
+
+    methods = {"chudnovsky": pidigits.compute_pi, **METHODS}
+    print(f"{'digits':>12}" + "".join(f"{name:>16}" for name in methods))
+    for n in sizes:
+        row = f"{n:>12,}"
+        results = set()
+        for compute in methods.values():
+            start = time.perf_counter()
+            results.add(compute(n))
+            row += f"{time.perf_counter() - start:>15.2f}s"
+        # The iterations stop on an error bound, so the last digit may differ by one
+        assert max(results) - min(results) <= 1, "backends disagree"
+        print(row, flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark AGM pi algorithms against Chudnovsky.")
+    parser.add_argument("sizes", type=int, nargs="*", default=[10 ** 4, 10 ** 5, 10 ** 6],
+                        help="digit counts to compare (default: 10k 100k 1M)")
+    args = parser.parse_args()
+    benchmark(args.sizes)
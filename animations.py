@@ -1,6 +1,16 @@
 from manim import *
 import math
 import numpy as np
+import itertools
+import pidigits
+import spigot
+import machin
+import service
+import digitstats
+import montecarlo
+import archimedes
+import lodpolygon
+import seriesplot
 # Set global background color
 config.background_color = "#1E1E1E"  # Dark gray background
 
@@ -23,16 +33,16 @@ class PiIntroScene(Scene):
         self.play(pi_symbol.animate.scale(3), run_time=2)
         self.wait(1)
 
-        # Define the first few digits of π
-        pi_digits = "3.1415926535897932384626433832795028841971"
+        # Stream the first few digits of π ("3." and 40 decimals)
+        num_digits = 42  # Get number of digits
+        pi_digits = itertools.islice(spigot.chars(), num_digits)
 
         # Create a circular arrangement of digits
         radius = 2  # Radius for circular placement
         digit_objects = VGroup()
-        num_digits = len(pi_digits)  # Get number of digits
         
-        for i in range(num_digits):  
-            digit_tex = MathTex(pi_digits[i]).scale(0.65).set_color(WHITE)
+        for i, digit in enumerate(pi_digits):  
+            digit_tex = MathTex(digit).scale(0.65).set_color(WHITE)
             angle = i * (2 * np.pi / num_digits)  
             x = radius * np.cos(angle)
             y = radius * np.sin(angle)
@@ -103,6 +113,62 @@ class PiInNature(Scene):
         self.add(tex)
         self.wait(2)
 
+class MonteCarloPi(Scene):
+    # Darts thrown over the course of the scene
+    num_darts = 10**6
+
+    def construct(self):
+        title = Tex("Measuring $\\pi$ by throwing darts").to_edge(UP)
+        self.play(Write(title))
+
+        # Unit square with the quarter circle x^2 + y^2 = 1 inside it
+        side = 6
+        square = Square(side_length=side, color=WHITE).to_edge(LEFT, buff=1).shift(0.4 * DOWN)
+        arc = Arc(radius=side, start_angle=0, angle=PI / 2, arc_center=square.get_corner(DL), color=BLUE)
+        self.play(Create(square), Create(arc))
+
+        # Every dart goes into one image, a pixel per screen pixel of the square,
+        # instead of one Dot per dart
+        board = montecarlo.DartBoard(int(side * config.pixel_height / config.frame_height))
+        cloud = ImageMobject(board.image())
+        cloud.set_resampling_algorithm(RESAMPLING_ALGORITHMS["nearest"])
+        cloud.height = side
+        cloud.move_to(square)
+        x, y, inside = next(montecarlo.throw(self.num_darts, batch=self.num_darts, seed=314))
+
+        # Darts thrown so far, on a log scale so the first ones can be seen landing
+        log_thrown = ValueTracker(0)
+
+        def throw_darts(mob):
+            target = int(10 ** log_thrown.get_value())
+            if target > board.total:
+                board.add(x[board.total:target], y[board.total:target], inside[board.total:target])
+                mob.pixel_array = board.image()
+
+        cloud.add_updater(throw_darts)
+
+        count = Integer(0, group_with_commas=True).add_updater(lambda m: m.set_value(board.total))
+        estimate = DecimalNumber(0, num_decimal_places=5).add_updater(lambda m: m.set_value(board.estimate))
+        band = DecimalNumber(0, num_decimal_places=5).add_updater(
+            lambda m: m.set_value(board.error if board.total else 0))
+        readout = VGroup(
+            VGroup(Tex("Darts:"), count).arrange(RIGHT),
+            VGroup(MathTex(r"\pi \approx"), estimate, MathTex(r"\pm"), band).arrange(RIGHT),
+        ).arrange(DOWN, aligned_edge=LEFT).next_to(square, RIGHT, buff=0.8)
+
+        self.add(cloud, readout)
+        self.play(log_thrown.animate.set_value(math.log10(self.num_darts)), run_time=8, rate_func=linear)
+        cloud.clear_updaters()
+        self.wait(1)
+
+        # A million measurements, and still only about three digits
+        truth = MathTex(r"\pi = " + pidigits.digits(5) + r"\ldots", color=YELLOW)
+        note = Tex(r"The error only shrinks like $1/\sqrt{N}$").scale(0.7)
+        VGroup(truth, note).arrange(DOWN, aligned_edge=LEFT).next_to(readout, DOWN, buff=0.8, aligned_edge=LEFT)
+        self.play(Write(truth))
+        self.play(FadeIn(note))
+        self.wait(2)
+
 class EngineerScene(Scene):
     def construct(self):
         # Load engineer and mathematician images (keeping your original positions)
@@ -129,12 +195,9 @@ class MathScene(Scene):
         mathematician = ImageMobject("mathematician.png").to_edge(DR).shift(RIGHT)  # Mathematician at Down Right
         mathematician_title = Tex("\"Mathematicians\"").scale(1.8).to_edge(UP)
       
-        math_pi_precise = VGroup(
-            Tex(r"3.1415926535 8979323846 2643383279"),
-            Tex(r"5028841971 6939937510 5820974944"),
-            Tex(r"5923078164 0628620899 8628034825"),
-            Tex(r"3421170679\ldots")
-        ).scale(0.8)
+        lines = pidigits.grouped_lines(100, per_line=3)
+        lines[-1] += r"\ldots"
+        math_pi_precise = VGroup(*[Tex(line) for line in lines]).scale(0.8)
         math_pi_precise.arrange(DOWN).move_to(2 * LEFT + DOWN) # Positioned to the left of the mathematician
         infinite = Tex("Infinite Precision", color = BLUE).next_to(math_pi_precise, UP, buff=0.5)
         
@@ -248,6 +311,9 @@ class PiUncanny(Scene):
 
 class PiComputation(Scene):
     def construct(self):
+        # Start computing the digits for step 3 while the intro renders
+        pending_digits = service.digits(0, 300)
+
         # Step 1: Show the Chudnovsky Algorithm Formula
         title = Tex("The Chunovsky Formula", color=BLUE).move_to(UP)
         chudnovsky_formula = MathTex(
@@ -275,14 +341,9 @@ class PiComputation(Scene):
         self.play(FadeIn(text[0]))
 
         # Step 3: Display π digits below the "100 Trillion Digits" text
-        pi_digits = VGroup(
-            Tex(r"3.1415926535 8979323846 2643383279 5028841971 6939937510"),
-            Tex(r"5820974944 5923078164 0628620899 8628034825 3421170679"),
-            Tex(r"8214808651 3282306647 0938446095 5058223172 5359408128"),
-            Tex(r"4811174502 8410270193 8521105559 6446229489 5493038196"),
-            Tex(r"2874406566 9234603486 1045432664 8213393607 2602491412"),
-            Tex(r"7372458700 6606315588 1748815209 2096282925 4091715364\ldots")
-        ).scale(0.65)
+        lines = pidigits.grouped_lines(300, digits=pending_digits.result())
+        lines[-1] += r"\ldots"
+        pi_digits = VGroup(*[Tex(line) for line in lines]).scale(0.65)
         pi_digits.arrange(DOWN, buff = 0.5, aligned_edge=LEFT)
         pi_digits.next_to(pi_digits_text, DOWN, buff=0.5)
 
@@ -431,8 +492,11 @@ class Archimedes(Scene):
    
 class ArchimedesPi(Scene):
     def construct(self):
+        # Bounds for 6, 12, 24, 48 and 96 sides, as far as Archimedes went
+        rows = archimedes.table(archimedes.ARCHIMEDES_STEPS)
+
         # Create the full progression label "6 -> 12 -> 24 -> 48 -> 96"
-        progression = MathTex("6", "\\rightarrow", "12", "\\rightarrow", "24", "\\rightarrow", "48", "\\rightarrow", "96", color=WHITE)
+        progression = MathTex(*" \\rightarrow ".join(str(sides) for sides, _, _ in rows).split(" "), color=WHITE)
         progression.to_edge(UP)
         
         # Initially, only show "6" (the first token)
@@ -444,7 +508,7 @@ class ArchimedesPi(Scene):
         self.play(Create(circle))
         
         # Define the sequence of side counts
-        sides_list = [6, 12, 24, 48, 96]
+        sides_list = [sides for sides, _, _ in rows]
         
         # Create initial inscribed and circumscribed polygons for n = 6
         n = sides_list[0]
@@ -484,8 +548,11 @@ class ArchimedesPi(Scene):
         self.play(ApplyMethod(group.scale, 2.5), run_time=1)
 
         # Finally, display Archimedes' bounds for π at the bottom of the scene
-        bounds = MathTex(r"\frac{223}{71} < \pi < \frac{22}{7}", color=WHITE).to_edge(DOWN)
-        numeric_bounds = MathTex(r"3.1408 < \pi < 3.1429")
+        # Archimedes rounded his 96-gon bounds to fractions: 223/71 < pi < 22/7
+        lower, upper = archimedes.rational_bounds(*rows[-1][1:])
+        bounds = MathTex(rf"\frac{{{lower.numerator}}}{{{lower.denominator}}} < \pi"
+                         rf" < \frac{{{upper.numerator}}}{{{upper.denominator}}}", color=WHITE).to_edge(DOWN)
+        numeric_bounds = MathTex(r"{} < \pi < {}".format(*archimedes.decimal_bounds(lower, upper, 4)))
         self.play(Write(bounds),
                   Write(numeric_bounds))
         self.wait(2)
@@ -495,16 +562,75 @@ class ArchimedesPi(Scene):
         FadeOut(numeric_bounds))
         self.wait()
 
+        # Keep doubling past Archimedes, up to millions of sides. The polygons
+        # are redrawn every frame with only the vertices that can be seen
+        radius = 2 * 2.5
+        rim = radius * RIGHT
+        last_step = 20
+        circle_lod = lodpolygon.LODPolygon(lodpolygon.CIRCLE_SIDES, radius=radius, color=BLUE)
+        inscribed_lod = lodpolygon.LODPolygon(sides_list[-1], radius=radius, color=WHITE)
+        circumscribed_lod = lodpolygon.LODPolygon(sides_list[-1], radius=radius, circumscribed=True, color=WHITE)
+        self.remove(circle, prev_inscribed, prev_circumscribed)
+        self.add(circle_lod, inscribed_lod, circumscribed_lod)
+
+        zoom = ValueTracker(0)       # log4 of the magnification about the rim
+        focus = ValueTracker(0)      # 1 once the rim is at the center of the screen
+        doublings = ValueTracker(0)  # past 96 sides
+
+        def place(mob):
+            scale = 4 ** zoom.get_value()
+            mob.set_geometry(center=-rim * scale + rim * (1 - focus.get_value()), radius=radius * scale)
+
+        def double(mob):
+            k, t = divmod(doublings.get_value(), 1)
+            mob.set_sides(sides_list[-1] << int(k), t)
+
+        for mob in (circle_lod, inscribed_lod, circumscribed_lod):
+            mob.add_updater(place)
+        for mob in (inscribed_lod, circumscribed_lod):
+            mob.add_updater(double)
+
+        # The rigorous bounds for every polygon on the way
+        deep_rows = archimedes.table(last_step)[len(sides_list) - 1:]
+        bound_labels = [
+            MathTex(r"{} < \pi < {}".format(*archimedes.decimal_bounds(lower, upper, 14)))
+            .add_background_rectangle().to_edge(DOWN)
+            for _, lower, upper in deep_rows
+        ]
+        bound_label = bound_labels[0].copy()
+        bound_label.add_updater(lambda m: m.become(bound_labels[int(doublings.get_value())]))
+        sides_count = Integer(sides_list[-1], group_with_commas=True)
+        sides_count.add_updater(lambda m: m.set_value(sides_list[-1] << int(doublings.get_value())))
+        sides_label = VGroup(sides_count, Tex("sides")).arrange(RIGHT).add_background_rectangle().to_edge(UP)
+        sides_label.add_updater(lambda m: m.to_edge(UP))
+
+        # Zoom in on the corner of the circumscribed polygon until it sits a
+        # unit outside the circle, about R pi^2 / (2 n^2) magnified. Each
+        # doubling cuts that by 4, so zooming by 4 per doubling keeps the
+        # picture still while the sides run into the millions
+        start_zoom = math.log(2 * sides_list[-1] ** 2 / (radius * PI ** 2), 4)
+        self.play(zoom.animate.set_value(start_zoom), focus.animate.set_value(1),
+                  FadeIn(sides_label), FadeIn(bound_label), run_time=3)
+        self.play(doublings.animate.set_value(last_step - len(sides_list) + 1),
+                  zoom.animate.set_value(start_zoom + last_step - len(sides_list) + 1),
+                  run_time=10, rate_func=linear)
+        self.wait(2)
+
+        # From afar, six million sides are a circle
+        self.play(zoom.animate.set_value(0), focus.animate.set_value(0),
+                  FadeOut(sides_label), FadeOut(bound_label), run_time=3)
+        for mob in (circle_lod, inscribed_lod, circumscribed_lod):
+            mob.remove_updater(place)
+        self.wait()
+
 
         tex = Tex(r"By 1630, this method could determine $\pi$ to $\textbf{39 decimal places}$").to_edge(UP)         
-        pi_text = MathTex(
-            r"\pi = 3.1415926535"
-            r"8979323846"
-            r"2643383279"
-            r"5028841971"
-        ) # Adjust scale if needed
+        pi_text = MathTex(r"\pi = " + pidigits.digits(40)) # Adjust scale if needed
         
-        tex1 = Tex("Millions of sides!").to_edge(DOWN)
+        # Plain doubling needs about 10^20 sides for that
+        steps, sides = archimedes.steps_for(39)
+        tex1 = Tex(rf"$6 \cdot 2^{{{steps}}} \approx {sides / 10 ** (len(str(sides)) - 1):.1f}"
+                   rf" \times 10^{{{len(str(sides)) - 1}}}$ sides!").to_edge(DOWN)
         # Surround it with a rectangle for emphasis
         rect = SurroundingRectangle(pi_text, color=YELLOW)
          
@@ -576,7 +702,7 @@ class MachinsFormula(Scene):
         name = Tex("John Machin(1706)").next_to(image, DOWN).scale(0.8)
         tex = Tex("In 1706, John Machin introduced Machin's Formula").arrange(DOWN).move_to(UP*3)
         formula_title = Tex("Machin's Formula", color=BLUE).move_to(2* LEFT+UP)
-        formula = MathTex(r"\frac{\pi}{4} = 4\tan^{-1} \frac{1}{5} - \tan^{-1} \frac{1}{239}").next_to(formula_title, DOWN)
+        formula = MathTex(machin.latex(machin.FORMULAS["machin"])).next_to(formula_title, DOWN)
         # self.add(image, name, tex, formula_title, formula)
         self.play(FadeIn(image),
                   Write(name),
@@ -585,10 +711,8 @@ class MachinsFormula(Scene):
         self.play(Write(formula_title),
                   Write(formula))
         self.wait(2)
-        pi_digits = MathTex(
-            r"\pi = 3.1415926535\, 8979323846\, 2643383279\, 5028841971\, 6939937510,",
-            r"5820974944\, 5923078164\, 0628620899\, 8628034825\, 3421170679"
-        ).scale(0.6)
+        lines = pidigits.grouped_lines(100, sep=r"\, ")
+        pi_digits = MathTex(r"\pi = " + lines[0] + ",", lines[1]).scale(0.6)
         
         # Arrange the digits in two lines
         pi_digits.arrange(DOWN, center=True).to_edge(DL)
@@ -623,22 +747,36 @@ class ArctanSeries(Scene):
         arctan_graph = axes.plot(lambda x: np.arctan(x), color=BLUE, x_range=[-1, 1])
         arctan_label = MathTex(r"y = \arctan(x)").scale(0.7).next_to(arctan_graph, UP, buff=0.3)
 
-        # Step 4: Show partial sums of the Maclaurin series
-        terms = [
-            lambda x: x,
-            lambda x: x - x**3 / 3,
-            lambda x: x - x**3 / 3 + x**5 / 5,
-            lambda x: x - x**3 / 3 + x**5 / 5 - x**7 / 7
-        ]
+        # Step 4: Show partial sums of the Maclaurin series, all orders up to
+        # max_terms in one array; near x = ±1 they need hundreds of terms
+        max_terms = 500
+        x = seriesplot.grid(-1, 1, max_terms)
+        points = seriesplot.graph_points(axes, x, seriesplot.arctan(x, max_terms))
+
         colors = [YELLOW, GREEN, ORANGE, RED]
         graphs = VGroup()
 
-        for i, term in enumerate(terms):
-            approx_graph = axes.plot(term, color=colors[i], x_range=[-1, 1])
+        for i, color in enumerate(colors):
+            approx_graph = VMobject(stroke_color=color).set_points_as_corners(points[i])
             graphs += approx_graph
-            term_label = MathTex(rf"y = \sum_{{n=0}}^{{{2*i+1}}} \frac{{(-1)^n x^{{2n+1}}}}{{2n+1}}").scale(0.6).next_to(approx_graph, DOWN, buff=0.3)
         
         self.add(title, formula, axes, arctan_graph, graphs)
+        self.wait()
+
+        # Step 5: Run one partial sum from 4 up to 500 terms, on a log scale
+        log_terms = ValueTracker(math.log10(len(colors)))
+
+        def terms():
+            return int(round(10 ** log_terms.get_value()))
+
+        partial = VMobject(stroke_color=RED).set_points_as_corners(points[len(colors) - 1])
+        partial.add_updater(lambda m: m.set_points_as_corners(points[terms() - 1]))
+        count = Integer(len(colors)).add_updater(lambda m: m.set_value(terms()))
+        term_label = VGroup(Tex("Terms:"), count).arrange(RIGHT).scale(0.8).to_corner(UR)
+
+        self.play(FadeOut(graphs), FadeIn(partial), FadeIn(term_label))
+        self.play(log_terms.animate.set_value(math.log10(max_terms)), run_time=8, rate_func=linear)
+        self.wait(2)
 
 class Ramanujan(Scene):
     def construct(self):
@@ -817,7 +955,13 @@ class FuturOfPI(Scene):
         
         
 class BBPAlg(Scene):
+    # Hex position whose digits are extracted at the end of the scene
+    position = 10**6
+
     def construct(self):
+        # The extraction takes a few seconds; run it while the scene plays
+        pending_hex = service.hex_digits(self.position)
+
         title = Tex("The BBP Algorithm").scale(1.2).move_to(3*UP)
         
         bbp_formula = MathTex(
@@ -843,6 +987,15 @@ class BBPAlg(Scene):
                   )
         self.wait(2)
 
+        # Digits straight from the formula, without computing the ones before
+        extracted = MathTex(
+            rf"\text{{Hex digits at position {self.position:,}:}} \;",
+            r"\texttt{" + pending_hex.result() + "}"
+        ).scale(0.6).next_to(bbp_formula, DOWN, buff=0.4)
+        extracted[1].set_color(YELLOW)
+        self.play(Write(extracted))
+        self.wait(2)
+
 
 class TimelinePiEvolution(Scene):
     def construct(self):
@@ -871,16 +1024,16 @@ class TimelinePiEvolution(Scene):
         self.wait(1)
 
         # Pi digits at different historical points
-        pi_values = [
-            "3",                           # 250 BCE - Archimedes
-            "3.14",                        # 1500s - Early modern approximations
-            "3.14159",                     # 1700s - Newton's work
-            "3.1415926535",                # 1800s - More precision
-            "3.141592653589793",           # 1900s - Calculus-based improvements
-            "3.14159265358979323846",      # 1950s - Early computers
-            "3.1415926535897932384626433", # 2000s - Supercomputers
-            "3.1415926535897932384626433832795028841971"  # 2020s - Trillions of digits
-        ]
+        pi_values = [pidigits.digits(n) for n in (
+            0,   # 250 BCE - Archimedes
+            2,   # 1500s - Early modern approximations
+            5,   # 1700s - Newton's work
+            10,  # 1800s - More precision
+            15,  # 1900s - Calculus-based improvements
+            20,  # 1950s - Early computers
+            25,  # 2000s - Supercomputers
+            40,  # 2020s - Trillions of digits
+        )]
 
         # Label to show pi digits
         pi_label = MathTex(r"\pi = " + pi_values[0] + r"\ldots").scale(0.8).to_edge(LEFT)
@@ -935,6 +1088,51 @@ class WhyComputePi(Scene):
             self.play(tex.animate.set_color(BLUE).scale(1.2))
         self.wait(2)
 
+class DigitHistogram(Scene):
+    # Number of decimals the statistics are taken over
+    num_digits = 10**6
+
+    def construct(self):
+        # Start computing the digits while the title plays
+        pending_store = service.store(self.num_digits)
+
+        title = MathTex(r"\text{The Unsolved Mysteries of } \pi").scale(0.8).to_edge(UP)
+        question = Tex("Does every digit show up equally often?").scale(0.7).next_to(title, DOWN)
+        self.play(Write(title))
+        self.play(FadeIn(question))
+        self.wait(1)
+
+        stats = digitstats.analyze(pending_store.result(), n=self.num_digits)
+        expected = self.num_digits / 10
+
+        # One bar per digit, on an axis that tops out a little above the expected count
+        chart = BarChart(
+            values=stats["frequencies"],
+            bar_names=[str(d) for d in range(10)],
+            y_range=[0, 1.2 * expected, 0.2 * expected],
+            x_length=9,
+            y_length=4,
+            bar_colors=[BLUE, TEAL],
+            y_axis_config={"font_size": 20},
+        ).next_to(question, DOWN, buff=0.4)
+        counts = chart.get_bar_labels(font_size=16)
+
+        # Where every bar would be if the digits were perfectly uniform
+        expected_line = DashedLine(chart.c2p(0, expected), chart.c2p(10, expected), color=YELLOW)
+        expected_label = Tex(f"{int(expected):,} each", color=YELLOW).scale(0.5).next_to(expected_line, RIGHT)
+
+        self.play(Create(chart), run_time=2)
+        self.play(FadeIn(counts))
+        self.play(Create(expected_line), Write(expected_label))
+        self.wait(1)
+
+        summary = VGroup(
+            MathTex(rf"\chi^2 = {stats['chi2']:.2f}, \quad p = {stats['p']:.2f}"),
+            Tex(f"Longest run of one digit: {stats['runs']['longest']}"),
+        ).arrange(DOWN).scale(0.6).next_to(chart, DOWN, buff=0.3)
+        self.play(Write(summary))
+        self.wait(3)
+
 class PiFinale(Scene):
     def construct(self):
         # Glowing Pi Symbol
@@ -943,10 +1141,8 @@ class PiFinale(Scene):
         self.wait(1)
 
         # Expanding Digits of Pi
-        pi_digits = MathTex(
-            "3.1415926535 8979323846 2643383279 5028841971 6939937510",
-            "5820974944 5923078164 0628620899 8628034825 3421170679...",
-        ).scale(0.7)
+        lines = pidigits.grouped_lines(100)
+        pi_digits = MathTex(lines[0], lines[1] + "...").scale(0.7)
         pi_digits.move_to(DOWN * 1.5)
 
         self.play(Write(pi_digits), run_time=2)
@@ -997,19 +1193,18 @@ class PiSpiralScene(Scene):
         # Transform to Happy Pi Day Message
         happy_pi = Tex("Happy ", r"$\pi$", " Day!").scale(1.5).set_color(ORANGE).move_to(2*DOWN)
 
-        # Define the first few digits of π
-        pi_digits = "3.14159265358979323846264338327950288419716939937510"
+        # Stream the first few digits of π ("3." and 50 decimals)
+        pi_digits = itertools.islice(spigot.chars(), 52)
         
         # Spiral Parameters
-        num_digits = len(pi_digits)  # Number of digits to animate
         spiral_radius = 0.3  # Distance between digits in the spiral
         spiral_expansion = 0.3  # Factor to increase spacing as it spirals out
         angle_shift = 0.3  # Angle shift per digit to form a spiral
         
         digit_objects = VGroup()
         
-        for i in range(num_digits):
-            digit_tex = MathTex(pi_digits[i]).scale(0.6).set_color(WHITE)
+        for i, digit in enumerate(pi_digits):
+            digit_tex = MathTex(digit).scale(0.6).set_color(WHITE)
             
             # Define Spiral Position
             angle = i * angle_shift
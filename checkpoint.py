@@ -0,0 +1,119 @@
+"""
+On-disk checkpoints of binary-splitting results, so a long digit run can
+pick up where it stopped instead of starting from zero.
+
+Every finished subtree [a, b) of the splitting tree is saved as its (P, Q, T)
+triple. The triple only depends on the term range, so a restarted job (or a
+bigger one over the same ranges) reuses whatever is on disk. Files are
+written atomically and carry a SHA-256 of their payload; a file that fails
+the check is deleted and recomputed.
+
+File layout:
+
+    magic b"PQTCKPT1", three uint64 byte lengths (P, Q, T), 32-byte SHA-256
+    of the payload, then the payload: P, Q, T as little-endian signed ints.
+"""
+import hashlib
+import os
+import struct
+import tempfile
+
+MAGIC = b"PQTCKPT1"
+HEADER = struct.Struct("<8s3Q32s")
+
+
+def _to_bytes(x):
+    return x.to_bytes((x.bit_length() + 8) // 8, "little", signed=True)
+
+
+class CheckpointStore:
+    """
+    A directory of (P, Q, T) checkpoints for one series.
+
+    With max_bytes set, a checkpoint that would push the directory over the
+    limit is skipped; its children stay on disk, so progress is never lost,
+    only coarser.
+    """
+
+    def __init__(self, directory, name="chudnovsky", max_bytes=None):
+        self.directory = directory
+        self.name = name
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.used = sum(
+            os.path.getsize(os.path.join(directory, f))
+            for f in os.listdir(directory) if f.startswith(name + "-")
+        )
+
+    def path(self, a, b):
+        return os.path.join(self.directory, f"{self.name}-{a}-{b}.pqt")
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(*key))
+
+    def load(self, a, b):
+        """The saved triple for [a, b), or None if missing or corrupt."""
+        path = self.path(a, b)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        if len(data) >= HEADER.size:
+            magic, lp, lq, lt, digest = HEADER.unpack_from(data)
+            payload = memoryview(data)[HEADER.size:]
+            if magic == MAGIC and len(payload) == lp + lq + lt and hashlib.sha256(payload).digest() == digest:
+                return (
+                    int.from_bytes(payload[:lp], "little", signed=True),
+                    int.from_bytes(payload[lp:lp + lq], "little", signed=True),
+                    int.from_bytes(payload[lp + lq:], "little", signed=True),
+                )
+        self.discard(a, b)
+        return None
+
+    def save(self, a, b, triple):
+        """Atomically write the triple for [a, b). Returns False if the size cap prevented it."""
+        parts = [_to_bytes(x) for x in triple]
+        size = HEADER.size + sum(len(p) for p in parts)
+        if self.max_bytes is not None and self.used + size > self.max_bytes:
+            return False
+
+        h = hashlib.sha256()
+        for p in parts:
+            h.update(p)
+        header = HEADER.pack(MAGIC, *(len(p) for p in parts), h.digest())
+
+        # Write next to the target and rename over it, so a crash leaves
+        # either the old state or the complete new file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                for p in parts:
+                    f.write(p)
+                f.flush()
+                os.fsync(f.fileno())
+            replaced = os.path.getsize(self.path(a, b)) if (a, b) in self else 0
+            os.replace(tmp, self.path(a, b))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.used += size - replaced
+        return True
+
+    def discard(self, a, b):
+        path = self.path(a, b)
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except FileNotFoundError:
+            return
+        self.used -= size
+
+    def clear(self):
+        """Remove every checkpoint of this series, e.g. once the run has finished."""
+        for f in os.listdir(self.directory):
+            if f.startswith(self.name + "-"):
+                os.unlink(os.path.join(self.directory, f))
+        self.used = 0
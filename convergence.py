@@ -0,0 +1,236 @@
+"""
+How fast does each formula of the video actually converge?
+
+Every formula is evaluated to a target precision, then checked against the
+Chudnovsky engine. For each one we report the terms (or iterations) used,
+the digits they got right, digits per term, wall time and peak memory:
+
+    python convergence.py 100 1000 10000 --json convergence.json --csv convergence.csv
+
+The numbers behind the scene claims: Ramanujan adds about 8 digits a term,
+Chudnovsky about 14, Machin's formula a little over one (its two arctan
+series are counted together), Leibniz only gets log10(terms) digits at all,
+and the AGM iterations double or quadruple the digits with every step.
+
+Series are summed term by term in decimal fixed point with GUARD_DIGITS extra
+digits, stopping once a term vanishes at that precision or after max_terms.
+Chudnovsky and the AGM iterations go through the pidigits.py / agm.py
+engines, so a slowdown there shows up here too.
+"""
+import math
+import time
+import tracemalloc
+
+import agm
+import pidigits
+
+# Extra digits carried by the term-by-term sums
+GUARD_DIGITS = 10
+
+# Default cap on the terms of one series, for those that will never get there
+MAX_TERMS = 10 ** 5
+
+
+def leibniz(n, max_terms=MAX_TERMS):
+    # pi/4 = 1 - 1/3 + 1/5 - 1/7 + ...
+    scale = 4 * 10 ** (n + GUARD_DIGITS)
+    total = 0
+    k = 0
+    while k < max_terms:
+        term = scale // (2 * k + 1)
+        if term == 0:
+            break
+        total += -term if k & 1 else term
+        k += 1
+    return total // 10 ** GUARD_DIGITS, k
+
+
+def newton(n, max_terms=MAX_TERMS):
+    # pi = 6 arcsin(1/2), with arcsin from Newton's binomial series:
+    # arcsin x = sum (2k)! / (4^k (k!)^2 (2k+1)) x^(2k+1)
+    p = 3 * 10 ** (n + GUARD_DIGITS)
+    total = 0
+    k = 0
+    while p and k < max_terms:
+        total += p // (2 * k + 1)
+        p = p * (2 * k + 1) // (8 * (k + 1))
+        k += 1
+    return total // 10 ** GUARD_DIGITS, k
+
+
+def _arctan_inv(x, scale, max_terms):
+    # arctan(1/x) * scale and the terms it took
+    p = scale // x
+    total = 0
+    k = 0
+    while p and k < max_terms:
+        term = p // (2 * k + 1)
+        total += -term if k & 1 else term
+        p //= x * x
+        k += 1
+    return total, k
+
+
+def machin(n, max_terms=MAX_TERMS):
+    # pi/4 = 4 arctan(1/5) - arctan(1/239), terms of both series counted
+    scale = 10 ** (n + GUARD_DIGITS)
+    a, ka = _arctan_inv(5, scale, max_terms)
+    b, kb = _arctan_inv(239, scale, max_terms)
+    return 4 * (4 * a - b) // 10 ** GUARD_DIGITS, ka + kb
+
+
+def ramanujan(n, max_terms=MAX_TERMS):
+    # 1/pi = 2 sqrt(2) / 9801 * sum (4k)! (1103 + 26390k) / ((k!)^4 396^(4k))
+    scale = 10 ** (n + GUARD_DIGITS)
+    p = scale
+    total = 0
+    k = 0
+    while p and k < max_terms:
+        total += p * (1103 + 26390 * k)
+        p = p * (4 * k + 1) * (4 * k + 2) * (4 * k + 3) * (4 * k + 4) // ((k + 1) ** 4 * 396 ** 4)
+        k += 1
+    sqrt8 = math.isqrt(8 * scale * scale)
+    return 9801 * scale ** 3 // (sqrt8 * total) // 10 ** GUARD_DIGITS, k
+
+
+def chudnovsky(n, max_terms=MAX_TERMS):
+    # The production engine; its term count is fixed in advance
+    return pidigits.compute_pi(n), pidigits.terms_for(n + pidigits.GUARD_DIGITS)
+
+
+def bbp(n, max_terms=MAX_TERMS):
+    # pi = sum 16^-k (4/(8k+1) - 2/(8k+4) - 1/(8k+5) - 1/(8k+6)), summed in full
+    p = 10 ** (n + GUARD_DIGITS)
+    total = 0
+    k = 0
+    while p and k < max_terms:
+        j = 8 * k
+        total += 4 * p // (j + 1) - 2 * p // (j + 4) - p // (j + 5) - p // (j + 6)
+        p >>= 4
+        k += 1
+    return total // 10 ** GUARD_DIGITS, k
+
+
+def _iterations(method):
+    # An agm.py method in the (n, max_terms) -> (value, iterations) shape
+    def run(n, max_terms=MAX_TERMS):
+        steps = []
+        value = method(n, callback=lambda k, digits: steps.append(k))
+        return value, len(steps)
+    return run
+
+
+FORMULAS = {
+    "leibniz": leibniz,
+    "newton": newton,
+    "machin": machin,
+    "ramanujan": ramanujan,
+    "chudnovsky": chudnovsky,
+    "bbp": bbp,
+    "gauss-legendre": _iterations(agm.gauss_legendre),
+    "borwein": _iterations(agm.borwein_quartic),
+}
+
+
+def correct_digits(value, reference, n):
+    """Decimals of value / 10**n that agree with reference / 10**n (floor(pi * 10**n))."""
+    error = abs(value - reference)
+    if error <= 1:
+        return n
+    return max(0, n - math.ceil(math.log10(error)))
+
+
+def measure(name, n, max_terms=MAX_TERMS, reference=None, memory=True):
+    """
+    Evaluate one formula to n decimals and return its row of the table.
+    Peak memory comes from a second, traced run (tracemalloc slows it down).
+    """
+    formula = FORMULAS[name]
+    if reference is None:
+        reference = pidigits.compute_pi(n)
+
+    start = time.perf_counter()
+    value, terms = formula(n, max_terms)
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            formula(n, max_terms)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    correct = correct_digits(value, reference, n)
+    return {
+        "formula": name,
+        "digits": n,
+        "terms": terms,
+        "correct_digits": correct,
+        "digits_per_term": correct / terms if terms else None,
+        "seconds": seconds,
+        "peak_bytes": peak,
+    }
+
+
+def run(sizes, names=None, max_terms=MAX_TERMS, memory=True, report=None):
+    """Measure every formula in `names` (default: all) at every size; report(row) sees each row."""
+    rows = []
+    for n in sizes:
+        reference = pidigits.compute_pi(n)
+        for name in names or FORMULAS:
+            row = measure(name, n, max_terms, reference, memory)
+            rows.append(row)
+            if report is not None:
+                report(row)
+    return rows
+
+
+FIELDS = ["formula", "digits", "terms", "correct_digits", "digits_per_term", "seconds", "peak_bytes"]
+
+
+def write_json(rows, path):
+    import json
+
+    with open(path, "w") as f:
+        json.dump(rows, f, indent=2)
+
+
+def write_csv(rows, path):
+    import csv
+
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _print_row(row):
+    per_term = f"{row['digits_per_term']:.3f}" if row["digits_per_term"] is not None else "-"
+    peak = f"{row['peak_bytes'] / 1024:.1f}K" if row["peak_bytes"] is not None else "-"
+    print(f"{row['formula']:>15} {row['digits']:>10,} {row['terms']:>9,} {row['correct_digits']:>10,}"
+          f" {per_term:>10} {row['seconds']:>9.3f}s {peak:>9}", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the convergence of the pi formulas in the video.")
+    parser.add_argument("sizes", type=int, nargs="*", default=[100, 1000, 10000],
+                        help="target decimals (default: 100 1000 10000)")
+    parser.add_argument("-f", "--formula", action="append", choices=list(FORMULAS),
+                        help="only run this formula (repeatable)")
+    parser.add_argument("--max-terms", type=int, default=MAX_TERMS,
+                        help=f"cap on the terms of one series (default: {MAX_TERMS:,})")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run for peak memory")
+    parser.add_argument("--json", help="write the table to this JSON file")
+    parser.add_argument("--csv", help="write the table to this CSV file")
+    args = parser.parse_args()
+
+    print(f"{'formula':>15} {'digits':>10} {'terms':>9} {'correct':>10} {'per term':>10} {'time':>10} {'peak':>9}")
+    rows = run(args.sizes, args.formula, args.max_terms, not args.no_memory, _print_row)
+    if args.json:
+        write_json(rows, args.json)
+    if args.csv:
+        write_csv(rows, args.csv)
@@ -0,0 +1,228 @@
+"""
+Find any digit string in the first N digits of pi ("find your birthday").
+
+The index lists, for every K-digit string, the positions where it occurs in
+a packed digit store, sorted, in one compressed array (CSR layout):
+
+    offsets.npy    int64[10**K + 1]  grams with code c are positions[offsets[c]:offsets[c + 1]]
+    positions.npy  uint32[N - K + 1] positions of every gram, grouped by code
+    meta.json      K, digit count and SHA-256 of the store it was built from
+
+Both arrays are memory-mapped, so opening an index is instant and a query
+only touches its buckets. A pattern of exactly K digits is one bucket; a
+longer one intersects the buckets of grams covering it; a shorter one is a
+contiguous range of buckets. Building takes two streaming passes over the
+store with bounded memory (counting, then scattering into the mapped
+positions array), so it scales past 100M digits.
+
+Positions are 0-based offsets after the decimal point, like DigitStore
+slices: find("14159") contains 0.
+
+    python digitindex.py build pi.digits pi.index
+    python digitindex.py find pi.index 0314 19700101
+    python digitindex.py bench pi.digits pi.index
+"""
+import json
+import os
+
+import numpy as np
+
+from digitstore import DigitStore
+
+# Digits per indexed gram; 10**K buckets
+K = 6
+
+# Longest gram whose code fits the uint32 codes (10**9 - 1 < 2**32)
+MAX_K = 9
+
+# Digits read from the store per pass of the build
+CHUNK = 1 << 24
+
+
+def _codes(d, k):
+    # The integer value of every k-digit window of the digit array d
+    codes = np.zeros(len(d) - k + 1, dtype=np.uint32)
+    for j in range(k):
+        codes *= 10
+        codes += d[j:len(d) - k + 1 + j]
+    return codes
+
+
+def _chunks(store, k, chunk):
+    # (first gram position, gram codes) for every chunk; chunks overlap by k - 1 digits
+    grams = len(store) - k + 1
+    for start in range(0, grams, chunk):
+        stop = min(start + chunk, grams)
+        yield start, _codes(store.array(start, stop + k - 1), k)
+
+
+def build(store_path, index_path, k=K, chunk=CHUNK):
+    """Index every k-digit gram of the store at store_path into the directory index_path."""
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"gram length {k} is not between 1 and {MAX_K}")
+    os.makedirs(index_path, exist_ok=True)
+    buckets = 10 ** k
+    with DigitStore(store_path) as store:
+        grams = len(store) - k + 1
+        if grams <= 0:
+            raise ValueError(f"{store_path}: fewer than {k} digits")
+        if grams > np.iinfo(np.uint32).max:
+            raise ValueError(f"{store_path}: too many digits for 32-bit positions")
+
+        # Pass 1: bucket sizes
+        counts = np.zeros(buckets, dtype=np.int64)
+        for _, codes in _chunks(store, k, chunk):
+            counts += np.bincount(codes, minlength=buckets)
+        offsets = np.zeros(buckets + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        # Pass 2: every position goes to its bucket's next free slot. Chunks
+        # come in order and the sort is stable, so buckets end up sorted
+        positions = np.lib.format.open_memmap(
+            os.path.join(index_path, "positions.npy"), mode="w+", dtype=np.uint32, shape=(grams,))
+        cursor = offsets[:-1].copy()
+        for start, codes in _chunks(store, k, chunk):
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            chunk_counts = np.bincount(sorted_codes, minlength=buckets)
+            group_start = np.cumsum(chunk_counts) - chunk_counts
+            slot = cursor[sorted_codes] + np.arange(len(order)) - group_start[sorted_codes]
+            positions[slot] = order + start
+            cursor += chunk_counts
+        positions.flush()
+        del positions
+
+        np.save(os.path.join(index_path, "offsets.npy"), offsets)
+        with open(os.path.join(index_path, "meta.json"), "w") as f:
+            json.dump({"k": k, "digits": len(store), "sha256": store.checksum.hex(),
+                       "store": os.path.abspath(store_path)}, f, indent=2)
+
+
+class DigitIndex:
+    """
+    A memory-mapped index built by build(). The store it was built from is
+    reopened for the last few digits, which no full gram covers; pass
+    store_path if it has moved.
+    """
+
+    def __init__(self, index_path, store_path=None):
+        with open(os.path.join(index_path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.k = self.meta["k"]
+        self.count = self.meta["digits"]
+        self.offsets = np.load(os.path.join(index_path, "offsets.npy"), mmap_mode="r")
+        self.positions = np.load(os.path.join(index_path, "positions.npy"), mmap_mode="r")
+
+        with DigitStore(store_path or self.meta["store"]) as store:
+            if store.checksum.hex() != self.meta["sha256"]:
+                raise ValueError(f"{index_path} was built from a different digit store")
+            # The last k - 1 digits, plus enough before them for a short
+            # pattern to overlap into them
+            self._tail_start = max(0, self.count - 2 * (self.k - 1))
+            self._tail = store[self._tail_start:self.count]
+
+    def _bucket(self, code):
+        return self.positions[self.offsets[code]:self.offsets[code + 1]]
+
+    def find(self, pattern):
+        """Sorted positions of every occurrence of the digit string pattern."""
+        if not pattern.isdigit():
+            raise ValueError(f"not a digit string: {pattern!r}")
+        k = self.k
+        if len(pattern) >= k:
+            # Grams at 0, k, 2k, ... and one flush with the end cover the pattern
+            starts = sorted({*range(0, len(pattern) - k + 1, k), len(pattern) - k})
+            found = None
+            for j in starts:
+                hits = self._bucket(int(pattern[j:j + k])).astype(np.int64) - j
+                found = hits if found is None else np.intersect1d(found, hits, assume_unique=True)
+            return found[found >= 0]
+
+        # Every gram starting with the pattern, then positions too close to
+        # the end to start a full gram
+        shift = 10 ** (k - len(pattern))
+        lo, hi = int(pattern) * shift, (int(pattern) + 1) * shift
+        found = np.sort(self.positions[self.offsets[lo]:self.offsets[hi]]).astype(np.int64)
+        first_tail = self.count - k + 1
+        tail = [self._tail_start + i for i in range(len(self._tail) - len(pattern) + 1)
+                if self._tail_start + i >= first_tail and self._tail.startswith(pattern, i)]
+        return np.concatenate([found, np.array(tail, dtype=np.int64)])
+
+    def first(self, pattern):
+        """Position of the first occurrence, or -1."""
+        found = self.find(pattern)
+        return int(found[0]) if len(found) else -1
+
+    def find_all(self, patterns):
+        """{pattern: first position or -1} for a batch of patterns."""
+        return {p: self.first(p) for p in patterns}
+
+
+def _size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def benchmark(store_path, index_path, queries=1000, seed=0):
+    """Build time, index size and query latency against str.find on the raw digits."""
+    import random
+    import time
+
+    start = time.perf_counter()
+    build(store_path, index_path)
+    t_build = time.perf_counter() - start
+    index = DigitIndex(index_path)
+    with DigitStore(store_path) as store:
+        text = store[:len(store)]
+    print(f"{len(text):,} digits: index built in {t_build:.2f}s, {_size(index_path) / 2 ** 20:.1f} MiB on disk")
+
+    rng = random.Random(seed)
+    print(f"{'length':>7} {'str.find':>12} {'index':>12} {'speedup':>8}   (first occurrence, per query)")
+    for length in (4, 6, 8, 10):
+        patterns = ["".join(rng.choice("0123456789") for _ in range(length)) for _ in range(queries)]
+
+        start = time.perf_counter()
+        expected = [text.find(p) for p in patterns[:max(1, queries // 100)]]
+        t_find = (time.perf_counter() - start) / len(expected)
+
+        start = time.perf_counter()
+        result = index.find_all(patterns)
+        t_index = (time.perf_counter() - start) / queries
+
+        assert [result[p] for p in patterns[:len(expected)]] == expected
+        print(f"{length:>7} {t_find * 1e3:>10.3f}ms {t_index * 1e3:>10.3f}ms {t_find / t_index:>7.1f}x", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Search digit strings in a packed digit store of pi.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("build", help="index a digit store")
+    p.add_argument("store")
+    p.add_argument("index")
+    p.add_argument("-k", type=int, default=K, choices=range(1, MAX_K + 1), metavar="K",
+                   help=f"gram length, at most {MAX_K} (default: {K})")
+    p = commands.add_parser("find", help="look up digit strings")
+    p.add_argument("index")
+    p.add_argument("patterns", nargs="+")
+    p.add_argument("--all", action="store_true", help="list every occurrence, not just the first")
+    p = commands.add_parser("bench", help="build an index and compare queries against str.find")
+    p.add_argument("store")
+    p.add_argument("index")
+    p.add_argument("--queries", type=int, default=1000, help="queries per pattern length (default: 1000)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build(args.store, args.index, args.k)
+    elif args.command == "find":
+        index = DigitIndex(args.index)
+        for pattern in args.patterns:
+            found = index.find(pattern)
+            if not len(found):
+                print(f"{pattern}: not in the first {index.count:,} digits")
+            elif args.all:
+                print(f"{pattern}: {len(found)} times, at decimals " + ", ".join(f"{p + 1:,}" for p in found))
+            else:
+                print(f"{pattern}: first at decimal {found[0] + 1:,} ({len(found)} times)")
+    else:
+        benchmark(args.store, args.index, args.queries)
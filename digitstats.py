@@ -0,0 +1,254 @@
+"""
+Digit statistics for the "Unsolved Mysteries of pi" segment: is pi normal?
+
+One streaming pass over a packed digit store collects
+
+    frequencies    how often each digit 0-9 occurs, with a chi-square test
+    k-grams        counts of every k-digit block, with a chi-square test
+    runs           lengths of runs of one repeated digit
+    gaps           distances between successive occurrences of each digit
+
+The store is cut into chunks that workers read and summarize on their own
+(with NumPy, a few passes over the chunk each); the chunk summaries merge
+associatively, stitching the runs, gaps and grams that straddle a boundary,
+so memory stays at a chunk per worker however many digits there are.
+
+    python digitstats.py pi.digits -k 3 -j 4 --json stats.json
+"""
+import functools
+import math
+
+import numpy as np
+
+from digitstore import DigitStore
+
+# Digits per chunk handed to a worker
+CHUNK = 1 << 24
+
+# Runs and gaps at least this long share the last histogram bucket
+MAX_RUN = 32
+MAX_GAP = 512
+
+
+def _gammaincc(a, x):
+    # Regularized upper incomplete gamma function Q(a, x)
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        # Series for P(a, x)
+        term = total = 1 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1 - total * math.exp(log_prefix))
+    # Continued fraction for Q(a, x), modified Lentz
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    i = 1
+    while True:
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = b + an / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+        i += 1
+    return h * math.exp(log_prefix)
+
+
+def chi_square(counts):
+    """(chi-square statistic, p-value) of counts against a uniform distribution."""
+    counts = np.asarray(counts, dtype=np.float64)
+    expected = counts.sum() / len(counts)
+    chi2 = float(((counts - expected) ** 2).sum() / expected)
+    return chi2, _gammaincc((len(counts) - 1) / 2, chi2 / 2)
+
+
+def _chunk(path, start, stop, k, end=None):
+    # Summary of digits [start, stop) of the first `end` (default: all), runs
+    # of a digit at either end left open
+    with DigitStore(path) as store:
+        # k - 1 digits past the end so the grams starting here are complete
+        end = len(store) if end is None else min(end, len(store))
+        d = store.array(start, min(stop + k - 1, end))
+    length = stop - start
+
+    # Grams that would run past `end` are not counted
+    count = max(0, len(d) - k + 1)
+    codes = np.zeros(count, dtype=np.int64)
+    for j in range(k):
+        codes = codes * 10 + d[j:j + count]
+    grams = np.bincount(codes[:length], minlength=10 ** k)
+    d = d[:length]
+
+    # Runs: every maximal block of one digit; the first and last stay open
+    bounds = np.concatenate([[0], np.flatnonzero(d[1:] != d[:-1]) + 1, [length]])
+    lengths = np.diff(bounds)
+    runs = np.bincount(np.minimum(lengths[1:-1], MAX_RUN), minlength=MAX_RUN + 1)
+
+    gaps = np.zeros((10, MAX_GAP + 1), dtype=np.int64)
+    longest = np.zeros(10, dtype=np.int64)
+    first = np.full(10, -1, dtype=np.int64)
+    last = np.full(10, -1, dtype=np.int64)
+    for digit in range(10):
+        where = np.flatnonzero(d == digit)
+        if len(where):
+            first[digit], last[digit] = where[0], where[-1]
+            distances = np.diff(where)
+            gaps[digit] = np.bincount(np.minimum(distances, MAX_GAP), minlength=MAX_GAP + 1)
+            longest[digit] = distances.max(initial=0)
+
+    return {
+        "length": length,
+        "counts": np.bincount(d, minlength=10),
+        "grams": grams,
+        "runs": runs,
+        "head": (int(d[0]), int(lengths[0])),
+        "tail": (int(d[-1]), int(lengths[-1])),
+        "whole": len(lengths) == 1,
+        "gaps": gaps,
+        "longest_gap": longest,
+        "first": first,
+        "last": last,
+    }
+
+
+def merge(a, b):
+    """Summary of two adjacent chunks from their summaries."""
+    runs = a["runs"] + b["runs"]
+    head, tail, whole = a["head"], b["tail"], False
+    if a["tail"][0] == b["head"][0]:
+        # One run across the boundary
+        joined = (b["head"][0], a["tail"][1] + b["head"][1])
+        if a["whole"] and b["whole"]:
+            head = tail = joined
+            whole = True
+        elif a["whole"]:
+            head = joined
+        elif b["whole"]:
+            tail = joined
+        else:
+            runs[min(joined[1], MAX_RUN)] += 1
+    else:
+        if not a["whole"]:
+            runs[min(a["tail"][1], MAX_RUN)] += 1
+        if not b["whole"]:
+            runs[min(b["head"][1], MAX_RUN)] += 1
+
+    offset = a["length"]
+    gaps = a["gaps"] + b["gaps"]
+    longest = np.maximum(a["longest_gap"], b["longest_gap"])
+    for digit in range(10):
+        if a["last"][digit] >= 0 and b["first"][digit] >= 0:
+            gap = b["first"][digit] + offset - a["last"][digit]
+            gaps[digit, min(gap, MAX_GAP)] += 1
+            longest[digit] = max(longest[digit], gap)
+    shifted_first = np.where(b["first"] >= 0, b["first"] + offset, -1)
+    shifted_last = np.where(b["last"] >= 0, b["last"] + offset, -1)
+
+    return {
+        "length": offset + b["length"],
+        "counts": a["counts"] + b["counts"],
+        "grams": a["grams"] + b["grams"],
+        "runs": runs,
+        "head": head,
+        "tail": tail,
+        "whole": whole,
+        "gaps": gaps,
+        "longest_gap": longest,
+        "first": np.where(a["first"] >= 0, a["first"], shifted_first),
+        "last": np.where(shifted_last >= 0, shifted_last, a["last"]),
+    }
+
+
+def summarize(stats, k):
+    """The merged summary as plain numbers, ready for JSON or a scene."""
+    runs = stats["runs"].copy()
+    runs[min(stats["head"][1], MAX_RUN)] += 1
+    if not stats["whole"]:
+        runs[min(stats["tail"][1], MAX_RUN)] += 1
+
+    chi2, p = chi_square(stats["counts"])
+    gram_chi2, gram_p = chi_square(stats["grams"])
+    gaps = stats["gaps"]
+    lengths = np.arange(MAX_GAP + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_gap = (gaps * lengths).sum(axis=1) / gaps.sum(axis=1)
+
+    return {
+        "digits": stats["length"],
+        "frequencies": stats["counts"].tolist(),
+        "chi2": chi2,
+        "p": p,
+        "grams": {
+            "k": k,
+            "chi2": gram_chi2,
+            "p": gram_p,
+            "min": int(stats["grams"].min()),
+            "max": int(stats["grams"].max()),
+        },
+        "runs": {"histogram": runs.tolist(), "longest": int(np.flatnonzero(runs)[-1])},
+        "gaps": {
+            "mean": [round(float(g), 4) for g in mean_gap],
+            "longest": stats["longest_gap"].tolist(),
+            "histogram": gaps.sum(axis=0).tolist(),
+        },
+    }
+
+
+def analyze(path, k=2, workers=1, n=None, chunk=CHUNK):
+    """
+    Statistics of the first n decimals (default: all) in the digit store at
+    path, chunks summarized on `workers` processes.
+    """
+    with DigitStore(path) as store:
+        n = len(store) if n is None else min(n, len(store))
+    starts = list(range(0, n, chunk))
+    stops = [min(s + chunk, n) for s in starts]
+    args = ([path] * len(starts), starts, stops, [k] * len(starts), [n] * len(starts))
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(workers) as pool:
+            return summarize(functools.reduce(merge, pool.map(_chunk, *args)), k)
+    return summarize(functools.reduce(merge, map(_chunk, *args)), k)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="Digit statistics of pi from a packed digit store.")
+    parser.add_argument("store", help="digit store (see digitstore.py)")
+    parser.add_argument("-n", type=int, help="only the first n decimals")
+    parser.add_argument("-k", type=int, default=2, help="block length for the k-gram counts (default: 2)")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes (default: 1)")
+    parser.add_argument("--json", help="write the statistics to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = analyze(args.store, args.k, args.workers, args.n)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(stats, f, indent=2)
+    print(f"{stats['digits']:,} digits in {elapsed:.2f}s")
+    for digit, count in enumerate(stats["frequencies"]):
+        print(f"  {digit}: {count:>14,}  ({count / stats['digits']:.6f})")
+    print(f"  chi-square {stats['chi2']:.3f} (9 dof), p = {stats['p']:.4f}")
+    print(f"  {args.k}-grams: chi-square {stats['grams']['chi2']:.1f}"
+          f" ({10 ** args.k - 1} dof), p = {stats['grams']['p']:.4f}")
+    print(f"  longest run: {stats['runs']['longest']}, longest gap: {max(stats['gaps']['longest'])}")
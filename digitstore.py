@@ -0,0 +1,204 @@
+"""
+Packed on-disk storage for long digit strings.
+
+Digits are stored two per byte (high nibble first) behind a fixed 64-byte
+header:
+
+    offset  size  field
+         0     8  magic b"PIDIGITS"
+         8     2  format version (1)
+        10     2  encoding (1 = packed BCD)
+        12     8  number of digits
+        20    32  SHA-256 of the packed payload
+        52    12  reserved, zero
+
+A DigitStore mmaps the file, so opening 100M digits costs nothing up front
+and slicing only touches the pages that hold the requested digits.
+
+    write_digits("pi.digits", pidigits.decimals(10**6))
+    store = DigitStore("pi.digits")
+    store[999_990:1_000_000]   # -> '5779458151'
+"""
+import hashlib
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"PIDIGITS"
+VERSION = 1
+ENCODING_BCD = 1
+
+HEADER = struct.Struct("<8sHHQ32s12x")
+HEADER_SIZE = HEADER.size  # 64
+
+
+class DigitStoreError(ValueError):
+    pass
+
+
+def pack(digits):
+    """Pack a digit string (str, bytes or uint8 array of 0-9) two digits per byte."""
+    if isinstance(digits, str):
+        digits = digits.encode("ascii")
+    if isinstance(digits, (bytes, bytearray, memoryview)):
+        d = np.frombuffer(digits, dtype=np.uint8) - ord("0")
+    else:
+        d = np.asarray(digits, dtype=np.uint8)
+    if len(d) % 2:
+        d = np.append(d, 0)
+    return ((d[0::2] << 4) | d[1::2]).astype(np.uint8)
+
+
+def unpack(packed, start, stop):
+    # Digits [start, stop) of a packed buffer whose first digit is number 0
+    packed = np.frombuffer(packed, dtype=np.uint8)[start // 2:(stop + 1) // 2]
+    d = np.empty(2 * len(packed), dtype=np.uint8)
+    d[0::2] = packed >> 4
+    d[1::2] = packed & 0x0F
+    return d[start % 2:start % 2 + stop - start]
+
+
+class DigitWriter:
+    """
+    Streaming writer: digits can be appended chunk by chunk, so a store can
+    be filled without the whole digit string ever being in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._hash = hashlib.sha256()
+        self._pending = b""  # an odd trailing digit waiting for its partner
+        self._file = open(path, "wb")
+        self._file.write(bytes(HEADER_SIZE))
+
+    def write(self, digits):
+        if isinstance(digits, str):
+            digits = digits.encode("ascii")
+        digits = self._pending + bytes(digits)
+        even = len(digits) - len(digits) % 2
+        self._pending = digits[even:]
+        packed = pack(digits[:even]).tobytes()
+        self._hash.update(packed)
+        self._file.write(packed)
+        self.count += even
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._pending:
+            packed = pack(self._pending).tobytes()
+            self._hash.update(packed)
+            self._file.write(packed)
+            self.count += 1
+            self._pending = b""
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, ENCODING_BCD, self.count, self._hash.digest()))
+        self._file.close()
+
+    def discard(self):
+        """Close and delete the file without writing its header, for a store left unfinished."""
+        if not self._file.closed:
+            self._file.close()
+            os.unlink(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        # A store cut short by an error must not look complete
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.close()
+
+
+def write_digits(path, digits):
+    """Write a whole digit string to a packed store."""
+    with DigitWriter(path) as writer:
+        writer.write(digits)
+
+
+class DigitStore:
+    """
+    Read-only, memory-mapped view of a packed digit file.
+
+    store[i] and store[a:b] return digit strings; array(a, b) returns the
+    digits as a uint8 array and raw(a, b) the packed bytes holding them as a
+    memoryview into the mapping, without copying.
+    """
+
+    def __init__(self, path, verify=False):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER_SIZE:
+            raise DigitStoreError(f"{path}: too short to be a digit store")
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, encoding, count, checksum = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise DigitStoreError(f"{path}: not a digit store")
+        if version != VERSION or encoding != ENCODING_BCD:
+            raise DigitStoreError(f"{path}: unsupported format (version {version}, encoding {encoding})")
+        if size != HEADER_SIZE + (count + 1) // 2:
+            raise DigitStoreError(f"{path}: truncated, expected {count} digits")
+
+        self.count = count
+        self.checksum = checksum
+        self.packed = np.frombuffer(self._mmap, dtype=np.uint8, offset=HEADER_SIZE)
+        if verify:
+            self.verify()
+
+    def verify(self):
+        """Recompute the payload checksum; raises DigitStoreError on mismatch."""
+        h = hashlib.sha256()
+        view = memoryview(self._mmap)[HEADER_SIZE:]
+        for i in range(0, len(view), 1 << 24):
+            h.update(view[i:i + (1 << 24)])
+        view.release()
+        if h.digest() != self.checksum:
+            raise DigitStoreError(f"{self.path}: checksum mismatch")
+
+    def __len__(self):
+        return self.count
+
+    def _range(self, start, stop):
+        start, stop, step = slice(start, stop).indices(self.count)
+        return start, max(start, stop)
+
+    def array(self, start=0, stop=None):
+        """Digits [start, stop) as a uint8 array of values 0-9."""
+        start, stop = self._range(start, stop)
+        return unpack(self.packed, start, stop)
+
+    def raw(self, start=0, stop=None):
+        """The packed bytes covering digits [start, stop), as a zero-copy memoryview."""
+        start, stop = self._range(start, stop)
+        return memoryview(self._mmap)[HEADER_SIZE + start // 2:HEADER_SIZE + (stop + 1) // 2]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("digit slices do not support a step")
+            return (self.array(key.start, key.stop) + ord("0")).tobytes().decode("ascii")
+        if key < 0:
+            key += self.count
+        if not 0 <= key < self.count:
+            raise IndexError("digit index out of range")
+        byte = self.packed[key // 2]
+        return str(byte >> 4 if key % 2 == 0 else byte & 0x0F)
+
+    def close(self):
+        # The numpy view has to go before the mapping can be closed
+        self.packed = None
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
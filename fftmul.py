@@ -0,0 +1,186 @@
+"""
+FFT big-integer multiplication (breakthrough #1 in the PiBreakthroughs scene).
+
+The operands are cut into 8-bit limbs, convolved with NumPy's float FFT and
+the carries propagated back into a Python int. With 8-bit limbs a
+coefficient of the product of n limbs is at most n * 255**2 < 2**(16 +
+log2 n), far enough below the 2**53 float mantissa for the rounding error to
+stay under 1/2 up to about 2**28 limbs (268M digits); every product is also
+checked against that and falls back to int.__mul__ if it gets close.
+
+    from fftmul import multiply
+    pidigits.compute_pi(10**7, mul=multiply)
+
+Below CROSSOVER_BITS CPython's Karatsuba is faster. The crossover is
+measured by tune() the first time multiply() sees a large operand, unless
+it has been set by hand. Before handing multiply() to a process pool, call
+prepare(): it tunes once in the parent and passes the result on to the
+workers, which would otherwise all measure at the same time and skew each
+other's timings. A worker that was not given one uses
+DEFAULT_CROSSOVER_BITS rather than tuning.
+"""
+import multiprocessing
+import os
+
+import numpy as np
+
+# Environment variable that carries the parent's crossover to pool workers
+CROSSOVER_ENV = "PI_FFT_CROSSOVER"
+
+# Operands smaller than this (in bits) are multiplied with int.__mul__;
+# None until tune() has run, unless inherited from the parent process
+CROSSOVER_BITS = int(os.environ[CROSSOVER_ENV]) if os.environ.get(CROSSOVER_ENV) else None
+
+# Crossover used by worker processes that were not given one (a typical
+# tune() result)
+DEFAULT_CROSSOVER_BITS = 1 << 16
+
+# Operands below this never go through the FFT, tuned or not
+MIN_FFT_BITS = 1 << 12
+
+# Largest distance from an integer tolerated in the inverse FFT output
+MAX_ROUNDING_ERROR = 0.25
+
+# Limbs per operand beyond which 8-bit limbs can no longer be exact
+MAX_LIMBS = 1 << 28
+
+
+def _limbs(x, size):
+    return np.frombuffer(x.to_bytes(size, "little"), dtype=np.uint8)
+
+
+def _from_coefficients(c):
+    # sum(c[i] << 8*i) for non-negative int64 coefficients, one byte plane at a time
+    result = 0
+    shift = 0
+    while c.any():
+        plane = (c & 0xFF).astype(np.uint8).tobytes()
+        result += int.from_bytes(plane, "little") << shift
+        c = c >> 8
+        shift += 8
+    return result
+
+
+def fft_multiply(a, b):
+    """a * b for non-negative ints through the FFT, regardless of size; None if not exact."""
+    na = (a.bit_length() + 7) // 8
+    nb = (b.bit_length() + 7) // 8
+    if min(na, nb) > MAX_LIMBS:
+        return None
+    n = na + nb
+    size = 1 << (n - 1).bit_length()
+
+    fa = np.fft.rfft(_limbs(a, na), size)
+    if a is b:
+        fb = fa
+    else:
+        fb = np.fft.rfft(_limbs(b, nb), size)
+    product = np.fft.irfft(fa * fb, size)[:n]
+
+    rounded = np.rint(product)
+    if np.max(np.abs(product - rounded), initial=0.0) > MAX_ROUNDING_ERROR:
+        return None
+    return _from_coefficients(rounded.astype(np.int64))
+
+
+def multiply(a, b):
+    """a * b, through the FFT for operands above CROSSOVER_BITS and int.__mul__ otherwise."""
+    bits = min(abs(a).bit_length(), abs(b).bit_length())
+    if bits < MIN_FFT_BITS:
+        return a * b
+    if CROSSOVER_BITS is None:
+        _set_crossover()
+    if bits < CROSSOVER_BITS:
+        return a * b
+    negative = (a < 0) != (b < 0)
+    result = fft_multiply(abs(a), abs(b))
+    if result is None:
+        return a * b
+    return -result if negative else result
+
+
+def _set_crossover():
+    # Tune in the main process only; workers tuning side by side would time
+    # each other
+    global CROSSOVER_BITS
+    if multiprocessing.parent_process() is None:
+        tune()
+    else:
+        CROSSOVER_BITS = DEFAULT_CROSSOVER_BITS
+
+
+def prepare():
+    """
+    Tune now if that has not happened yet, and export the crossover so that
+    processes started from here on use it. Returns CROSSOVER_BITS.
+    """
+    if CROSSOVER_BITS is None:
+        tune()
+    os.environ[CROSSOVER_ENV] = str(CROSSOVER_BITS)
+    return CROSSOVER_BITS
+
+
+def _time(f, *args, repeat=3):
+    import time
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def tune(min_bits=1 << 14, max_bits=1 << 22):
+    """
+    Measure where the FFT starts beating int.__mul__, set CROSSOVER_BITS to
+    it and return it. Sizes double from min_bits; the crossover is the first
+    size from which the FFT wins twice in a row.
+    """
+    import random
+
+    global CROSSOVER_BITS
+    bits = min_bits
+    wins = 0
+    while bits <= max_bits:
+        a = random.getrandbits(bits)
+        b = random.getrandbits(bits)
+        if _time(fft_multiply, a, b) < _time(lambda: a * b):
+            wins += 1
+            if wins == 2:
+                CROSSOVER_BITS = bits // 2
+                return CROSSOVER_BITS
+        else:
+            wins = 0
+        bits *= 2
+    CROSSOVER_BITS = max_bits
+    return CROSSOVER_BITS
+
+
+def benchmark(sizes):
+    """Time int.__mul__ and the FFT product for operands of the given digit counts."""
+    import random
+
+    print(f"{'digits':>12} {'int.__mul__':>12} {'fft':>10} {'speedup':>8}")
+    for n in sizes:
+        bits = int(n * 3.3219280948873626)
+        a = random.getrandbits(bits)
+        b = random.getrandbits(bits)
+        t_int = _time(lambda: a * b, repeat=1)
+        t_fft = _time(fft_multiply, a, b, repeat=1)
+        assert fft_multiply(a, b) == a * b
+        print(f"{n:>12,} {t_int:>11.3f}s {t_fft:>9.3f}s {t_int / t_fft:>7.1f}x", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark FFT multiplication against int.__mul__.")
+    parser.add_argument("sizes", type=int, nargs="*", default=[10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7],
+                        help="operand sizes in decimal digits (default: 10k 100k 1M 10M)")
+    parser.add_argument("--tune", action="store_true", help="also measure the crossover size")
+    args = parser.parse_args()
+
+    benchmark(args.sizes)
+    if args.tune:
+        print(f"crossover: {tune():,} bits")
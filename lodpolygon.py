@@ -0,0 +1,228 @@
+"""
+Regular polygons with millions of sides, drawn at constant cost per frame.
+
+A RegularPolygon with 6 * 2^20 sides holds 25 million Bezier points, every
+one of them transformed and stroked each frame, nearly all of them closer
+together than a pixel or off the screen. LODPolygon regenerates its points
+every frame from its center and radius instead, keeping only
+
+    the vertices inside the visible frame (plus one on either side), and
+    every s-th of those, s the largest power of two for which the dropped
+    vertices stay within `tolerance` pixels of the chords drawn.
+
+Zoomed out a million-gon is drawn as a circle of a few dozen points;
+zoomed in on its rim the visible vertices are the exact ones. Either way
+the count is bounded by MAX_VERTICES.
+
+Doubling is animated with `doubling` = t in [0, 1]: the polygon is drawn as
+a 2n-gon whose new vertices start on the edges of the n-gon (t = 0) and
+end on the 2n-gon (t = 1), inscribed or circumscribed.
+
+    python lodpolygon.py     # time the ArchimedesPi doubling run without rendering
+"""
+import math
+
+import numpy as np
+from manim import ORIGIN, RIGHT, VMobject, config
+
+# How far the dropped vertices may stray from the drawn chords
+TOLERANCE_PIXELS = 0.25
+
+# Cap on the points of one frame, however the polygon is zoomed
+MAX_VERTICES = 1 << 12
+
+# Sides of a polygon that passes for a circle at any zoom we use
+CIRCLE_SIDES = 6 << 40
+
+
+def _radii(n, circumscribed, t):
+    # Radii of the even and odd vertices of the 2n-gon for a unit circle, t
+    # of the way from the n-gon (odd vertices mid-edge) to the 2n-gon
+    if circumscribed:
+        return ((1 - t) / math.cos(math.pi / n) + t / math.cos(math.pi / (2 * n)),
+                (1 - t) + t / math.cos(math.pi / (2 * n)))
+    return 1.0, (1 - t) * math.cos(math.pi / n) + t
+
+
+def _visible_angles(center, outer, inner, frame_center, frame_size):
+    # Angular range (from, to) of the circle of radius `outer` that can be in
+    # the frame, the full turn if the center is in it, or None if the
+    # polygon's boundary, between `inner` and `outer`, misses the frame
+    half = np.asarray(frame_size, dtype=float) / 2
+    offset = np.asarray(frame_center, dtype=float)[:2] - np.asarray(center, dtype=float)[:2]
+    corners = offset + half * np.array([[1, 1], [-1, 1], [-1, -1], [1, -1]])
+    nearest = np.linalg.norm(np.maximum(np.abs(offset) - half, 0))
+    farthest = np.linalg.norm(corners, axis=1).max()
+    if nearest > outer or farthest < inner:
+        return None
+    if np.all(np.abs(offset) <= half):
+        return 0.0, 2 * math.pi
+    # The center is outside the frame, so the frame spans less than half a turn
+    toward = math.atan2(offset[1], offset[0])
+    deltas = (np.arctan2(corners[:, 1], corners[:, 0]) - toward + math.pi) % (2 * math.pi) - math.pi
+    return toward + deltas.min(), toward + deltas.max()
+
+
+def vertices(n, radius, center=ORIGIN, start_angle=0.0, circumscribed=False, doubling=0.0,
+             frame_center=ORIGIN, frame_size=None, tolerance=None, max_vertices=MAX_VERTICES):
+    """
+    The corners to draw for a regular n-gon inscribed in (or circumscribed
+    about) the circle of `radius` around `center`, with a vertex at
+    start_angle, as an (m, 3) array; the first and last coincide when the
+    whole polygon is drawn. tolerance is in scene units, a quarter pixel by
+    default.
+    """
+    if frame_size is None:
+        frame_size = (config.frame_width, config.frame_height)
+    if tolerance is None:
+        tolerance = TOLERANCE_PIXELS * frame_size[0] / config.pixel_width
+    even, odd = _radii(n, circumscribed, doubling)
+    outer = radius * max(even, odd)
+    visible = _visible_angles(center, outer, radius * min(even, odd) * math.cos(math.pi / n),
+                              frame_center, frame_size)
+    if visible is None:
+        return np.zeros((0, 3))
+
+    # Vertices of the 2n-gon are step radians apart; keep every stride-th
+    step = math.pi / n
+    if tolerance >= outer:
+        stride = 2 * n
+    else:
+        stride = max(1, int(2 * math.acos(1 - tolerance / outer) / step))
+    stride = 1 << (stride.bit_length() - 1)
+
+    if visible == (0.0, 2 * math.pi):
+        first, last = 0, 2 * n
+    else:
+        first = math.floor((visible[0] - start_angle) / step / stride) * stride - stride
+        last = math.ceil((visible[1] - start_angle) / step / stride) * stride + stride
+    while (last - first) // stride > max_vertices:
+        stride *= 2
+    index = np.append(np.arange(first, last, stride, dtype=np.int64), last)
+
+    angle = start_angle + index * step
+    r = radius * np.where(index % 2 == 0, even, odd)
+    points = np.zeros((len(index), 3))
+    points[:, 0] = center[0] + r * np.cos(angle)
+    points[:, 1] = center[1] + r * np.sin(angle)
+    return points
+
+
+class LODPolygon(VMobject):
+    """
+    A regular n-gon inscribed in (or circumscribed about) a circle, redrawn
+    every frame with only the vertices that can be seen (see vertices()).
+
+    Shifts, rotations and uniform scaling move the underlying circle, so the
+    polygon keeps its exact geometry however far it is zoomed. Pass the
+    camera frame of a MovingCameraScene as camera_frame to follow it.
+    """
+
+    def __init__(self, n, radius=1.0, circumscribed=False, camera_frame=None,
+                 tolerance=TOLERANCE_PIXELS, max_vertices=MAX_VERTICES, **kwargs):
+        self.n = n
+        self.doubling = 0.0
+        self.circumscribed = circumscribed
+        self.camera_frame = camera_frame
+        self.tolerance = tolerance
+        self.max_vertices = max_vertices
+        # The circle's center and the point at the polygon's first vertex angle on it
+        self.anchor = np.array([ORIGIN, radius * RIGHT], dtype=float)
+        super().__init__(**kwargs)
+        self.add_updater(lambda m: m.refresh())
+
+    @property
+    def center(self):
+        return self.anchor[0].copy()
+
+    @property
+    def radius(self):
+        return float(np.linalg.norm(self.anchor[1] - self.anchor[0]))
+
+    @property
+    def start_angle(self):
+        direction = self.anchor[1] - self.anchor[0]
+        return math.atan2(direction[1], direction[0])
+
+    def generate_points(self):
+        self.refresh()
+
+    def refresh(self):
+        """Regenerate the points for the current geometry and frame."""
+        if self.camera_frame is not None:
+            frame_center = self.camera_frame.get_center()
+            frame_size = (self.camera_frame.width, self.camera_frame.height)
+        else:
+            frame_center = ORIGIN
+            frame_size = (config.frame_width, config.frame_height)
+        points = vertices(self.n, self.radius, self.center, self.start_angle, self.circumscribed,
+                          self.doubling, frame_center, frame_size,
+                          self.tolerance * frame_size[0] / config.pixel_width, self.max_vertices)
+        if len(points):
+            self.set_points_as_corners(points)
+        else:
+            self.clear_points()
+        return self
+
+    def set_sides(self, n, doubling=0.0):
+        """An n-gon, `doubling` of the way to the 2n-gon."""
+        self.n = n
+        self.doubling = doubling
+        return self.refresh()
+
+    def set_geometry(self, center=None, radius=None):
+        """Move the underlying circle."""
+        direction = (self.anchor[1] - self.anchor[0]) / self.radius
+        if center is not None:
+            self.anchor[0] = center
+        if radius is not None:
+            self.anchor[1] = self.anchor[0] + radius * direction
+        else:
+            self.anchor[1] = self.anchor[0] + self.radius * direction
+        return self.refresh()
+
+    # Keep the circle in step with the usual transformations of the points
+
+    def shift(self, *vectors):
+        self.anchor += np.sum(vectors, axis=0)
+        return super().shift(*vectors)
+
+    def apply_points_function_about_point(self, func, about_point=None, about_edge=None):
+        if about_point is None:
+            about_point = self.get_critical_point(ORIGIN if about_edge is None else about_edge)
+        self.anchor = func(self.anchor - about_point) + about_point
+        return super().apply_points_function_about_point(func, about_point)
+
+
+def benchmark(steps=20, frames_per_doubling=30):
+    """Time the vertices of the ArchimedesPi zoom from 96 to 6 * 2^steps sides, per frame."""
+    import time
+
+    radius = 5.0
+    times, counts = [], []
+    for k in range(4, steps):
+        n = 6 << k
+        for frame in range(frames_per_doubling):
+            t = frame / frames_per_doubling
+            # Zoomed so the gap between the polygons, about R pi^2 / n^2, is one unit
+            scale = (n * 2 ** t) ** 2 / (radius * math.pi ** 2)
+            center = np.array([-radius * scale, 0, 0])
+            start = time.perf_counter()
+            inner = vertices(n, radius * scale, center, doubling=t)
+            outer = vertices(n, radius * scale, center, circumscribed=True, doubling=t)
+            circle = vertices(CIRCLE_SIDES, radius * scale, center)
+            times.append(time.perf_counter() - start)
+            counts.append(len(inner) + len(outer) + len(circle))
+
+    print(f"96 -> {6 << steps:,} sides, {len(times)} frames: "
+          f"{np.mean(times) * 1e3:.3f}ms per frame (max {max(times) * 1e3:.3f}ms), "
+          f"{np.mean(counts):.0f} points per frame (max {max(counts)})")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time the level-of-detail polygons of ArchimedesPi.")
+    parser.add_argument("steps", type=int, nargs="?", default=20, help="doublings up to 6 * 2^steps sides (default: 20)")
+    args = parser.parse_args()
+    benchmark(args.steps)
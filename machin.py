@@ -0,0 +1,293 @@
+"""
+Machin-like formulas: pi/4 = sum c_i arctan(1/k_i).
+
+Every arctan(1/k) is its own binary-splitting series (series.arctan), so
+the terms are independent and run on one worker process each. This gives a
+second pipeline, sharing no series with the Chudnovsky one, to check the
+digits against:
+
+    python machin.py 100000 --formula takano --verify
+
+Formulas are lists of (c, k) pairs. Whether one really sums to pi/4 is
+checked exactly: arctan(1/k) is the argument of the Gaussian integer k + i,
+so the formula holds iff prod (k + i)^c has equal, positive real and
+imaginary parts (and the float sum rules out an extra multiple of 2 pi).
+
+The cost of a formula is roughly its Lehmer measure, sum 1 / log10(k): the
+terms arctan(1/k) needs for n digits are n / log10(k^2 + 1). `rank` lists
+formulas by that measure and by measured time.
+
+`search` finds new formulas the way Stormer did. Take the k whose k^2 + 1
+has no prime factor outside a small set; each such k + i factors into the
+Gaussian primes above them, so arctan(1/k) is a sum of their arguments.
+Any m + 1 of those k over m primes (besides 2) have integer coefficients
+that cancel every prime, leaving a multiple of pi/4, and is_valid keeps the
+combinations where that multiple is 1:
+
+    python machin.py 100000 --search 4 --rank
+"""
+import itertools
+import math
+import operator
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from series import arctan_fixed
+
+# Extra bits carried beyond the requested precision
+GUARD_BITS = 64
+
+# Odd primes k^2 + 1 may be built from in a search (the ones below 100; all
+# are 1 mod 4, as every odd prime factor of k^2 + 1 is)
+SEARCH_PRIMES = [5, 13, 17, 29, 37, 41, 53, 61, 73, 89, 97]
+
+# Largest k tried in a search
+SEARCH_LIMIT = 10 ** 6
+
+FORMULAS = {
+    "machin": [(4, 5), (-1, 239)],
+    "euler": [(1, 2), (1, 3)],
+    "hutton": [(2, 3), (1, 7)],
+    "hermann": [(2, 2), (-1, 7)],
+    "klingenstierna": [(8, 10), (-1, 239), (-4, 515)],
+    "gauss": [(12, 18), (8, 57), (-5, 239)],
+    "stormer": [(6, 8), (2, 57), (1, 239)],
+    "stormer-1896": [(44, 57), (7, 239), (-12, 682), (24, 12943)],
+    "takano": [(12, 49), (32, 57), (-5, 239), (12, 110443)],
+    "hwang-1997": [(183, 239), (32, 1023), (-68, 5832), (12, 110443), (-12, 4841182), (-100, 6826318)],
+}
+
+
+def _gaussian_pow(z, e):
+    # z**e for a Gaussian integer z = (re, im) and e >= 0
+    result = (1, 0)
+    while e:
+        if e & 1:
+            result = (result[0] * z[0] - result[1] * z[1], result[0] * z[1] + result[1] * z[0])
+        z = (z[0] * z[0] - z[1] * z[1], 2 * z[0] * z[1])
+        e >>= 1
+    return result
+
+
+def is_valid(terms):
+    """True if sum c * arctan(1/k) over the (c, k) terms is exactly pi/4."""
+    re, im = 1, 0
+    for c, k in terms:
+        # arctan(-1/k) is the argument of the conjugate k - i
+        z = _gaussian_pow((k, 1 if c > 0 else -1), abs(c))
+        re, im = re * z[0] - im * z[1], re * z[1] + im * z[0]
+    approx = sum(c * math.atan(1 / k) for c, k in terms)
+    return re == im > 0 and abs(approx - math.pi / 4) < 1
+
+
+def lehmer_measure(terms):
+    """sum 1 / log10(k): lower means fewer series terms per digit overall."""
+    return sum(1 / math.log10(k) for _, k in terms)
+
+
+def _sqrt_minus_one(p):
+    # The smaller square root of -1 mod a prime p = 1 mod 4: g^((p-1)/4) for
+    # a quadratic non-residue g
+    g = next(g for g in range(2, p) if pow(g, (p - 1) // 2, p) == p - 1)
+    r = pow(g, (p - 1) // 4, p)
+    return min(r, p - r)
+
+
+def smooth_arguments(primes=SEARCH_PRIMES, limit=SEARCH_LIMIT):
+    """
+    {k: {p: e}} for the 1 < k <= limit whose k^2 + 1 factors over 2 and
+    `primes`. e is the exponent of p, signed by which of the two Gaussian
+    primes above p divides k + i: positive for the one dividing r + i, r the
+    smaller square root of -1 mod p.
+    """
+    k = np.arange(2, limit + 1, dtype=np.int64)
+    rest = k * k + 1
+    for p in [2, *primes]:
+        divisible = rest % p == 0
+        while divisible.any():
+            rest[divisible] //= p
+            divisible = rest % p == 0
+
+    roots = {p: _sqrt_minus_one(p) for p in primes}
+    result = {}
+    for k in k[rest == 1].tolist():
+        n = k * k + 1
+        exponents = {}
+        for p in primes:
+            e = 0
+            while n % p == 0:
+                n //= p
+                e += 1
+            if e:
+                exponents[p] = e if k % p == roots[p] else -e
+        result[k] = exponents
+    return result
+
+
+def _det(rows):
+    # Determinant of a square integer matrix (Bareiss, exact)
+    m = [list(row) for row in rows]
+    n = len(m)
+    sign, previous = 1, 1
+    for i in range(n):
+        if m[i][i] == 0:
+            swap = next((j for j in range(i + 1, n) if m[j][i]), None)
+            if swap is None:
+                return 0
+            m[i], m[swap] = m[swap], m[i]
+            sign = -sign
+        for j in range(i + 1, n):
+            for l in range(i + 1, n):
+                m[j][l] = (m[j][l] * m[i][i] - m[j][i] * m[i][l]) // previous
+        previous = m[i][i]
+    return sign * m[n - 1][n - 1] if n else 1
+
+
+def search(size=3, primes=SEARCH_PRIMES, limit=SEARCH_LIMIT, count=10):
+    """
+    Up to `count` formulas of `size` arctan terms with every k <= limit,
+    built from smooth_arguments(primes, limit), as lists of (c, k) with the
+    lowest Lehmer measure first. Every one passes is_valid.
+    """
+    arguments = smooth_arguments(primes, limit)
+    found = {}
+    for support in itertools.combinations(primes, size - 1):
+        allowed = set(support)
+        ks = [k for k, exponents in arguments.items() if exponents.keys() <= allowed]
+        for combo in itertools.combinations(ks, size):
+            # Every prime has to occur, or a smaller support finds the formula
+            if set().union(*(arguments[k].keys() for k in combo)) != allowed:
+                continue
+            # The coefficients cancelling every prime: the signed maximal
+            # minors of the exponent matrix (primes x ks)
+            matrix = [[arguments[k].get(p, 0) for k in combo] for p in support]
+            c = [(-1) ** i * _det([row[:i] + row[i + 1:] for row in matrix]) for i in range(size)]
+            if 0 in c:
+                continue
+            g = math.gcd(*c)
+            for sign in (1, -1):
+                terms = [(sign * ci // g, k) for ci, k in zip(c, combo)]
+                if is_valid(terms):
+                    found[combo] = terms
+    return sorted(found.values(), key=lehmer_measure)[:count]
+
+
+def name(terms):
+    """A short name for a formula from its arguments, e.g. "18,57,239"."""
+    return ",".join(str(k) for _, k in terms)
+
+
+def latex(terms):
+    """The formula as MathTex source, e.g. for the MachinsFormula scene."""
+    tex = r"\frac{\pi}{4} = "
+    for i, (c, k) in enumerate(terms):
+        if i:
+            tex += " - " if c < 0 else " + "
+        elif c < 0:
+            tex += "-"
+        if abs(c) != 1:
+            tex += str(abs(c))
+        tex += rf"\tan^{{-1}} \frac{{1}}{{{k}}}"
+    return tex
+
+
+def compute_pi(n, terms=FORMULAS["machin"], workers=None, mul=None):
+    """
+    Return floor(pi * 10**n), give or take a unit in the last place, from a
+    Machin-like formula. The arctan terms go to one process each (`workers`,
+    default one per term); with workers=1 they run here, one after another.
+    """
+    if not is_valid(terms):
+        raise ValueError(f"not a formula for pi/4: {terms}")
+    mul = mul or operator.mul
+    workers = workers or min(len(terms), os.cpu_count())
+    bits = int(n * math.log2(10)) + GUARD_BITS + sum(abs(c) for c, _ in terms).bit_length()
+
+    ks = [k for _, k in terms]
+    args = (ks, [bits] * len(ks), [1] * len(ks), [mul] * len(ks))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            atans = list(pool.map(arctan_fixed, *args))
+    else:
+        atans = list(map(arctan_fixed, *args))
+
+    pi = 4 * sum(c * a for (c, _), a in zip(terms, atans))
+    return mul(pi, 10 ** n) >> bits
+
+
+def rank(n, names=None, workers=None, report=None, formulas=FORMULAS):
+    """
+    Time every formula in `names` (default: all of `formulas`, the table or
+    e.g. search results by name) to n digits and return rows sorted by
+    measured time; report(row) sees each row as it comes.
+    """
+    import time
+
+    rows = []
+    for name in names or formulas:
+        terms = formulas[name]
+        start = time.perf_counter()
+        compute_pi(n, terms, workers)
+        row = {
+            "formula": name,
+            "terms": len(terms),
+            "lehmer": lehmer_measure(terms),
+            "seconds": time.perf_counter() - start,
+        }
+        rows.append(row)
+        if report is not None:
+            report(row)
+    return sorted(rows, key=lambda row: row["seconds"])
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Compute pi with Machin-like arctan formulas.")
+    parser.add_argument("n", type=int, help="number of digits after the decimal point")
+    parser.add_argument("-f", "--formula", default="machin", choices=list(FORMULAS),
+                        help="formula to compute with (default: machin)")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: one per arctan term)")
+    parser.add_argument("--rank", action="store_true", help="time every formula in the table instead")
+    parser.add_argument("--search", type=int, metavar="TERMS",
+                        help="search for formulas of this many terms, and rank them too with --rank")
+    parser.add_argument("--search-limit", type=int, default=SEARCH_LIMIT,
+                        help=f"largest k tried by --search (default: {SEARCH_LIMIT:,})")
+    parser.add_argument("--count", type=int, default=10, help="formulas kept by --search (default: 10)")
+    parser.add_argument("--verify", action="store_true", help="check the result against the Chudnovsky series")
+    args = parser.parse_args()
+
+    formulas = dict(FORMULAS)
+    if args.search:
+        start = time.perf_counter()
+        found = search(args.search, limit=args.search_limit, count=args.count)
+        print(f"{len(found)} formulas of {args.search} terms in {time.perf_counter() - start:.2f}s:")
+        for terms in found:
+            print(f"  {lehmer_measure(terms):.3f}  {terms}")
+        formulas.update((name(terms), terms) for terms in found)
+        if not args.rank:
+            raise SystemExit
+
+    if args.rank:
+        print("by Lehmer measure: " + ", ".join(sorted(formulas, key=lambda f: lehmer_measure(formulas[f]))))
+        width = max(map(len, formulas))
+        print(f"{'formula':>{width}} {'terms':>6} {'lehmer':>8} {'time':>10}")
+        rows = rank(args.n, workers=args.workers, formulas=formulas, report=lambda row: print(
+            f"{row['formula']:>{width}} {row['terms']:>6} {row['lehmer']:>8.3f} {row['seconds']:>9.2f}s", flush=True))
+        print("by time: " + ", ".join(row["formula"] for row in rows))
+        raise SystemExit
+
+    start = time.perf_counter()
+    result = compute_pi(args.n, FORMULAS[args.formula], args.workers)
+    print(f"{args.formula}: {args.n} digits in {time.perf_counter() - start:.2f}s")
+
+    if args.verify:
+        import pidigits
+
+        # The last digit may differ by one, the rest has to match
+        if abs(result - pidigits.compute_pi(args.n)) > 1:
+            raise SystemExit("MISMATCH with the Chudnovsky series")
+        print("matches the Chudnovsky series")
@@ -0,0 +1,148 @@
+"""
+Monte Carlo estimate of pi: throw darts at the unit square and count the
+ones landing inside the quarter circle x^2 + y^2 < 1, a fraction pi/4 of
+them on average.
+
+Points are drawn with NumPy in batches, so millions cost milliseconds. The
+estimate after N darts has a standard error of 4 sqrt(p (1 - p) / N) with
+p = pi/4, about 1.6 / sqrt(N): a million darts only pin down pi to about
+three decimals, which is the point the PiInNature scene makes about
+physical measurements.
+
+For drawing, DartBoard accumulates the darts into per-pixel counts and
+renders them as one RGBA image (an ImageMobject in the MonteCarloPi scene),
+so the frame cost depends on the resolution, not on the number of darts.
+"""
+import math
+
+import numpy as np
+
+# Darts drawn per batch
+BATCH = 1 << 20
+
+# z-value of the error band (95%)
+Z = 1.96
+
+
+def throw(n, batch=BATCH, seed=None):
+    """Yield (x, y, inside) arrays for n uniform darts in the unit square, batch by batch."""
+    rng = np.random.default_rng(seed)
+    while n > 0:
+        size = min(batch, n)
+        x = rng.random(size, dtype=np.float32)
+        y = rng.random(size, dtype=np.float32)
+        yield x, y, x * x + y * y < 1
+        n -= size
+
+
+def error(hits, total):
+    """Half-width of the 95% error band of the estimate 4 * hits / total."""
+    p = hits / total
+    return 4 * Z * math.sqrt(p * (1 - p) / total)
+
+
+def estimate(n, batch=BATCH, seed=None):
+    """(estimate, error band) after n darts."""
+    hits = 0
+    for _, _, inside in throw(n, batch, seed):
+        hits += int(np.count_nonzero(inside))
+    return 4 * hits / n, error(hits, n)
+
+
+class DartBoard:
+    """
+    Per-pixel counts of darts inside and outside the quarter circle, on a
+    square of `resolution` pixels with (0, 0) at the bottom left.
+
+    The RGBA image is kept up to date as darts come in, touching only the
+    pixels they land on, so adding a frame's worth of darts is cheap.
+    """
+
+    # Opacity added per dart in a pixel
+    ALPHA_PER_DART = 96
+
+    def __init__(self, resolution, inside_color=(88, 196, 221), outside_color=(255, 134, 47)):
+        self.resolution = resolution
+        self.inside_color = np.array(inside_color, dtype=np.uint8)
+        self.outside_color = np.array(outside_color, dtype=np.uint8)
+        self.inside = np.zeros(resolution * resolution, dtype=np.int64)
+        self.outside = np.zeros(resolution * resolution, dtype=np.int64)
+        self._rgba = np.zeros((resolution * resolution, 4), dtype=np.uint8)
+        self.hits = 0
+        self.total = 0
+
+    def add(self, x, y, inside):
+        """Add a batch of darts."""
+        r = self.resolution
+        # Row 0 of the image is the top edge, y = 1
+        col = np.minimum((x * r).astype(np.int64), r - 1)
+        row = np.minimum(((1 - y) * r).astype(np.int64), r - 1)
+        pixel = row * r + col
+        if len(pixel) > r * r // 8:
+            self.inside += np.bincount(pixel[inside], minlength=r * r)
+            self.outside += np.bincount(pixel[~inside], minlength=r * r)
+            touched = slice(None)
+        else:
+            np.add.at(self.inside, pixel[inside], 1)
+            np.add.at(self.outside, pixel[~inside], 1)
+            touched = np.unique(pixel)
+        self.hits += int(np.count_nonzero(inside))
+        self.total += len(inside)
+
+        inside_count = self.inside[touched]
+        outside_count = self.outside[touched]
+        self._rgba[touched, :3] = np.where((inside_count >= outside_count)[:, None],
+                                           self.inside_color, self.outside_color)
+        self._rgba[touched, 3] = np.minimum((inside_count + outside_count) * self.ALPHA_PER_DART, 255)
+
+    @property
+    def estimate(self):
+        return 4 * self.hits / self.total if self.total else 0.0
+
+    @property
+    def error(self):
+        return error(self.hits, self.total) if self.total else float("inf")
+
+    def image(self):
+        """
+        The board as a (resolution, resolution, 4) uint8 RGBA array. It is a
+        view that later add() calls update in place.
+        """
+        r = self.resolution
+        return self._rgba.reshape(r, r, 4)
+
+
+def benchmark(n, resolution, frames):
+    """Time sampling, accumulating and rendering n darts revealed over `frames` frames."""
+    import time
+
+    start = time.perf_counter()
+    x, y, inside = next(throw(n, batch=n, seed=0))
+    t_throw = time.perf_counter() - start
+
+    board = DartBoard(resolution)
+    start = time.perf_counter()
+    bounds = np.linspace(0, n, frames + 1, dtype=np.int64)
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        board.add(x[a:b], y[a:b], inside[a:b])
+        board.image()
+    t_frames = time.perf_counter() - start
+
+    print(f"{n:,} darts: sampled in {t_throw * 1e3:.1f}ms, pi ~ {board.estimate:.5f} +- {board.error:.5f}")
+    print(f"{frames} frames at {resolution}px: {t_frames / frames * 1e3:.2f}ms per frame")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Monte Carlo estimate of pi.")
+    parser.add_argument("n", type=int, nargs="?", default=10 ** 6, help="number of darts (default: 1M)")
+    parser.add_argument("--seed", type=int, help="random seed")
+    parser.add_argument("--bench", action="store_true", help="time the point-cloud rendering for a 1080p scene")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.n, resolution=810, frames=480)
+    else:
+        pi, band = estimate(args.n, seed=args.seed)
+        print(f"pi ~ {pi:.6f} +- {band:.6f} (95%) after {args.n:,} darts")
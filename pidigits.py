@@ -0,0 +1,312 @@
+"""
+Arbitrary-precision digits of pi.
+
+Evaluates the Chudnovsky series (the one shown in the PiComputation and
+Chudnovsky scenes) with binary splitting:
+
+    1/pi = 12 * sum_n (-1)^n (6n)! (13591409 + 545140134n) / ((3n)! (n!)^3 640320^(3n + 3/2))
+
+Scenes ask for digits with `digits(n)` instead of carrying hand-typed strings.
+
+    >>> digits(10)
+    '3.1415926535'
+"""
+import math
+import operator
+import os
+
+import agm
+from series import CHUDNOVSKY, RAMANUJAN
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+# Every term of the series adds log10(C^3 / 1728) ~= 14.18 digits
+DIGITS_PER_TERM = CHUDNOVSKY.digits_per_term
+
+LOG2_10 = math.log2(10)
+
+# Extra digits computed beyond what was asked for, dropped at the end
+GUARD_DIGITS = 10
+
+# Below this size (in bits) CPython's own division is faster than Newton
+NEWTON_CUTOFF = 50000
+
+# The binary splitting itself lives in series.py; these are the Chudnovsky
+# instances under their old names
+bs = CHUDNOVSKY.bs
+bs_tree = CHUDNOVSKY.tree
+bs_parallel = CHUDNOVSKY.parallel
+terms_for = CHUDNOVSKY.terms
+
+# Series backends: pi = factor * sqrt(radicand) * Q / (divisor * T)
+SERIES = {
+    "chudnovsky": (CHUDNOVSKY, 426880, 10005, 1),
+    "ramanujan": (RAMANUJAN, 9801, 2, 4),
+}
+
+
+def compute_pi(n, workers=1, checkpoints=None, method="chudnovsky", mul=None):
+    """
+    Return floor(pi * 10**n) as an integer.
+
+    With workers > 1 the binary splitting runs on a process pool. With a
+    CheckpointStore finished subtrees are saved as they complete, and a
+    rerun of the same job resumes from them.
+
+    method selects another backend instead of the Chudnovsky series: the
+    Ramanujan series ("ramanujan"), or one of agm.METHODS ("gauss-legendre",
+    "borwein"), which run serially and keep no checkpoints; asking for
+    either with those raises ValueError.
+
+    mul replaces int.__mul__ for the big products, e.g. fftmul.multiply.
+    """
+    mul = mul or operator.mul
+    if method not in SERIES:
+        if workers > 1 or checkpoints is not None:
+            raise ValueError(f"{method} runs serially, without checkpoints")
+        return agm.METHODS[method](n, mul)
+
+    series, factor, radicand, divisor = SERIES[method]
+    prec = n + GUARD_DIGITS
+    _, Q, T = series.evaluate(prec, workers, checkpoints, mul)
+
+    # Work in binary fixed point with `bits` fractional bits; Q and T only
+    # need that many significant bits for the final quotient
+    bits = int(prec * LOG2_10) + 64
+    shift = max(0, min(Q.bit_length(), T.bit_length()) - bits - 64)
+    Q >>= shift
+    T >>= shift
+
+    if gmpy2 is not None:
+        Q, T = gmpy2.mpz(Q), gmpy2.mpz(T)
+        sqrt_c = gmpy2.isqrt(gmpy2.mpz(radicand) << 2 * bits)
+        pi = int((Q * factor * sqrt_c) // (T * divisor))
+    else:
+        sqrt_c = _sqrt_fixed(radicand, bits, mul)
+        pi = divide(mul(Q * factor, sqrt_c), T * divisor, mul)
+
+    return (mul(pi, 10 ** prec) >> bits) // 10 ** GUARD_DIGITS
+
+
+def divide(a, b, mul=operator.mul):
+    """
+    floor(a / b) for positive integers, through a Newton reciprocal so the
+    cost is a few multiplications instead of CPython's quadratic long division.
+    """
+    if b.bit_length() < NEWTON_CUTOFF or a.bit_length() - b.bit_length() < NEWTON_CUTOFF:
+        return a // b
+
+    prec = a.bit_length() - b.bit_length() + 32
+    r = reciprocal(b, prec, mul)
+    q = mul(a, r) >> (prec + b.bit_length())
+
+    rem = a - mul(q, b)
+    while rem < 0:
+        q -= 1
+        rem += b
+    while rem >= b:
+        q += 1
+        rem -= b
+    return q
+
+
+def reciprocal(b, prec, mul=operator.mul):
+    """Approximately 2**(prec + bitlen(b)) // b, accurate to a few units."""
+    if prec <= NEWTON_CUTOFF:
+        return (1 << (prec + b.bit_length())) // b
+
+    # Only the leading prec + 32 bits of b matter at this precision
+    shift = max(0, b.bit_length() - prec - 32)
+    bt = b >> shift
+    n = bt.bit_length()
+
+    # Solve at half precision, then one Newton step doubles it
+    half = prec // 2 + 16
+    z = reciprocal(bt, half, mul) << (prec - half)
+    e = (1 << (prec + n)) - mul(bt, z)
+    z += mul(z, e) >> (prec + n)
+    return z
+
+
+def _inv_sqrt_fixed(c, prec, mul):
+    # Approximately 2**prec / sqrt(c), by Newton's iteration for 1/sqrt(c)
+    if prec <= NEWTON_CUTOFF:
+        return math.isqrt((1 << 2 * prec) // c)
+
+    half = prec // 2 + 16
+    y = _inv_sqrt_fixed(c, half, mul) << (prec - half)
+    e = (1 << 2 * prec) - c * mul(y, y)
+    return y + (mul(y, e) >> (2 * prec + 1))
+
+
+def _sqrt_fixed(c, prec, mul):
+    # Approximately sqrt(c) * 2**prec, for a small positive integer c
+    return c * _inv_sqrt_fixed(c, prec, mul)
+
+
+# Largest digit string computed so far; smaller requests are sliced from it
+_cache = ""
+
+# A packed digit store (see digitstore.py) to read decimals from instead of
+# computing them, e.g. one written with `python pidigits.py N --store FILE`
+STORE_PATH = os.environ.get("PI_DIGITS_STORE")
+
+
+def _from_store(n):
+    if not STORE_PATH or not os.path.exists(STORE_PATH):
+        return None
+    from digitstore import DigitStore
+
+    with DigitStore(STORE_PATH) as store:
+        return store[:n] if len(store) >= n else None
+
+
+def decimals(n, workers=1):
+    """Return the first n digits of pi after the decimal point."""
+    from radix import to_decimal
+
+    global _cache
+    if n > len(_cache):
+        _cache = _from_store(n) or to_decimal(compute_pi(n, workers))[1:]
+    return _cache[:n]
+
+
+def write_store(path, n, workers=1, checkpoints=None, method="chudnovsky", mul=None):
+    """
+    Compute n decimals and stream them into a packed digit store, without
+    ever holding them as one string.
+    """
+    from digitstore import DigitWriter
+    from radix import write_decimal
+
+    x = compute_pi(n, workers, checkpoints, method, mul) - 3 * 10 ** n
+    with DigitWriter(path) as writer:
+        write_decimal(x, writer.write, width=n, mul=mul)
+
+
+def digits(n, workers=1):
+    """Return pi as a string with n digits after the decimal point ("3" for n = 0)."""
+    if n == 0:
+        return "3"
+    return "3." + decimals(n, workers)
+
+
+def grouped_lines(n, group=10, per_line=5, sep=" ", digits=None):
+    """
+    Split the first n decimals into blocks of `group` digits, `per_line`
+    blocks to a line. The first line carries the leading "3.".
+
+    digits supplies the decimals when they are already at hand, e.g. from
+    service.py; otherwise they are computed here.
+    """
+    digits = digits or decimals(n)
+    blocks = [digits[i:i + group] for i in range(0, n, group)]
+    blocks[0] = "3." + blocks[0]
+    return [sep.join(blocks[i:i + per_line]) for i in range(0, len(blocks), per_line)]
+
+
+def benchmark(sizes, workers):
+    """Time serial against parallel binary splitting and print the speedup."""
+    import time
+
+    print(f"{'digits':>12} {'serial':>10} {'parallel':>10} {'speedup':>8}   ({workers} workers)")
+    for n in sizes:
+        terms = terms_for(n + GUARD_DIGITS)
+
+        start = time.perf_counter()
+        serial = bs(0, terms)
+        t_serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = bs_parallel(0, terms, workers)
+        t_parallel = time.perf_counter() - start
+
+        assert serial == parallel
+        print(f"{n:>12,} {t_serial:>9.2f}s {t_parallel:>9.2f}s {t_serial / t_parallel:>7.2f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Compute digits of pi with the Chudnovsky series.")
+    parser.add_argument("n", type=int, nargs="?", help="number of digits after the decimal point")
+    parser.add_argument("-o", "--output", help="write the digits to this file instead of stdout")
+    parser.add_argument("--store", help="write the decimals to this packed digit store (see digitstore.py)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes for the binary splitting (default: 1)")
+    parser.add_argument("--bench", type=int, nargs="*", metavar="DIGITS",
+                        help="compare serial and parallel splitting (default sizes: 1M 10M 100M)")
+    parser.add_argument("--method", default="chudnovsky", choices=[*SERIES, *agm.METHODS],
+                        help="algorithm to compute with (default: chudnovsky)")
+    parser.add_argument("--fft", action="store_true",
+                        help="multiply large operands with the NumPy FFT (see fftmul.py)")
+    parser.add_argument("--checkpoint-dir", help="save finished subtrees here and resume from them on restart")
+    parser.add_argument("--checkpoint-limit", type=float, metavar="GB",
+                        help="cap on the disk space used by checkpoints")
+    parser.add_argument("--verify", metavar="REPORT",
+                        help="with --store, check the digits by BBP (see verify.py) and write a signed report here")
+    parser.add_argument("--key-file", help="HMAC key file for --verify (default: $PI_VERIFY_KEY)")
+    args = parser.parse_args()
+
+    if args.bench is not None:
+        workers = args.workers if args.workers > 1 else os.cpu_count()
+        benchmark(args.bench or [10 ** 6, 10 ** 7, 10 ** 8], workers)
+        raise SystemExit
+    if args.n is None:
+        parser.error("the number of digits is required")
+    if args.method in agm.METHODS and (args.workers > 1 or args.checkpoint_dir):
+        parser.error(f"--method {args.method} runs serially, without -j or --checkpoint-dir")
+    key = None
+    if args.verify:
+        import verify
+
+        if not args.store:
+            parser.error("--verify needs --store")
+        # Before computing anything, not after
+        try:
+            key = verify.load_key(args.key_file)
+        except ValueError as e:
+            parser.error(str(e))
+
+    checkpoints = None
+    if args.checkpoint_dir:
+        from checkpoint import CheckpointStore
+
+        limit = int(args.checkpoint_limit * 2 ** 30) if args.checkpoint_limit else None
+        checkpoints = CheckpointStore(args.checkpoint_dir, name=args.method, max_bytes=limit)
+
+    mul = None
+    if args.fft:
+        from fftmul import multiply as mul, prepare
+        prepare()
+
+    start = time.perf_counter()
+    if args.store:
+        write_store(args.store, args.n, args.workers, checkpoints, args.method, mul)
+        print(f"{args.n} digits in {time.perf_counter() - start:.2f}s -> {args.store}")
+        if args.verify:
+            report = verify.sign(verify.verify_store(args.store, workers=args.workers, mul=mul), key)
+            verify.write_report(report, args.verify)
+            print(f"{'verified' if report['verified'] else 'VERIFICATION FAILED'}"
+                  f" in {report['seconds']:.2f}s -> {args.verify}")
+            raise SystemExit(0 if report["verified"] else 1)
+        raise SystemExit
+
+    if checkpoints is not None or args.method != "chudnovsky" or mul is not None:
+        from radix import to_decimal
+
+        result = "3." + to_decimal(compute_pi(args.n, args.workers, checkpoints, args.method, mul), mul)[1:]
+    else:
+        result = digits(args.n, args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(result)
+        print(f"{args.n} digits in {elapsed:.2f}s -> {args.output}")
+    else:
+        print(result)
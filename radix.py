@@ -0,0 +1,175 @@
+"""
+Subquadratic conversion of big integers to decimal.
+
+CPython's str(int) is quadratic in the number of digits, which makes it the
+slowest step of a multi-million digit run. Here the number is split in half
+by a power 10**w, recursively, down to chunks small enough for str(). The
+powers 10**(LEAF_DIGITS * 2**i) and their Newton reciprocals are computed once
+per level, so every split costs a couple of multiplications.
+
+The digits come out most significant first, in chunks, so they can go
+straight into a DigitWriter without building one giant string:
+
+    with DigitWriter("pi.digits") as writer:
+        write_decimal(x, writer.write, width=n)
+"""
+import operator
+import sys
+
+from pidigits import reciprocal
+
+# Chunks below 10**LEAF_DIGITS are converted with str()
+LEAF_DIGITS = 1000
+
+
+class _Level:
+    # 10**w together with what it takes to divide by it quickly
+    def __init__(self, width, mul):
+        self.width = width
+        self.mul = mul
+        self.power = 10 ** width
+        self.bits = self.power.bit_length()
+        # Quotients at this level are below 10**width, so this many bits of
+        # reciprocal are enough to get them right to within one or two
+        self.prec = self.bits + 32
+        self.recip = reciprocal(self.power, self.prec, mul)
+
+    def split(self, x):
+        # divmod(x, 10**width) for 0 <= x < 10**(2 * width)
+        q = self.mul(x, self.recip) >> (self.prec + self.bits)
+        r = x - self.mul(q, self.power)
+        while r < 0:
+            q -= 1
+            r += self.power
+        while r >= self.power:
+            q += 1
+            r -= self.power
+        return q, r
+
+
+def _levels(digits, mul):
+    # Levels of doubling width, the last one able to split `digits` digits
+    levels = [_Level(LEAF_DIGITS, mul)]
+    while 2 * levels[-1].width < digits:
+        levels.append(_Level(2 * levels[-1].width, mul))
+    return levels
+
+
+def _emit(x, n, levels, out):
+    # Write x < 10**n as exactly n digits, leading zeros included
+    if n <= 2 * LEAF_DIGITS:
+        out(str(x).zfill(n))
+        return
+    # The narrowest level whose split covers n digits puts the low `width`
+    # digits in lo and the remaining (at most as many) in hi
+    level = next(level for level in levels if 2 * level.width >= n)
+    hi, lo = level.split(x)
+    _emit(hi, n - level.width, levels, out)
+    _emit(lo, level.width, levels, out)
+
+
+def _skip_leading_zeros(out):
+    started = False
+
+    def write(chunk):
+        nonlocal started
+        if not started:
+            chunk = chunk.lstrip("0")
+            started = bool(chunk)
+        if chunk:
+            out(chunk)
+    return write
+
+
+def write_decimal(x, out, width=None, mul=None):
+    """
+    Feed the decimal digits of the non-negative integer x to out(chunk), most
+    significant first. With `width`, exactly that many digits are written,
+    zero-padded on the left. `mul` replaces int.__mul__ for the big products.
+    """
+    if x < 0:
+        raise ValueError("only non-negative integers are supported")
+    # Digit count from the bit length; it may overshoot by one
+    digits = x.bit_length() * 30103 // 100000 + 1
+
+    if width is None:
+        if x == 0:
+            out("0")
+            return
+        width = digits
+        out = _skip_leading_zeros(out)
+    elif digits > width + 1 or (digits == width + 1 and x >= 10 ** width):
+        raise ValueError(f"{x.bit_length()}-bit integer does not fit in {width} digits")
+    if width == 0:
+        return
+
+    _emit(x, width, _levels(width, mul or operator.mul), out)
+
+
+def to_decimal(x, mul=None):
+    """Decimal string of the integer x, like str(x) but subquadratic."""
+    if x < 0:
+        return "-" + to_decimal(-x, mul)
+    chunks = []
+    write_decimal(x, chunks.append, mul=mul)
+    return "".join(chunks)
+
+
+def from_decimal(s, mul=None):
+    """int(s) for a string of decimal digits, subquadratic like to_decimal()."""
+    mul = mul or operator.mul
+    # powers[i] = 10**(LEAF_DIGITS * 2**i), enough to split len(s) digits
+    powers = [10 ** LEAF_DIGITS]
+    while LEAF_DIGITS << len(powers) < len(s):
+        powers.append(mul(powers[-1], powers[-1]))
+
+    def parse(lo, hi):
+        if hi - lo <= 2 * LEAF_DIGITS:
+            return int(s[lo:hi])
+        # The widest power below the length splits off the low digits
+        i = ((hi - lo - 1) // LEAF_DIGITS).bit_length() - 1
+        width = LEAF_DIGITS << i
+        return mul(parse(lo, hi - width), powers[i]) + parse(hi - width, hi)
+
+    return parse(0, len(s))
+
+
+def benchmark(sizes):
+    """Time to_decimal() against CPython's str() for integers of the given sizes."""
+    import random
+    import time
+
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(0)
+
+    # Zero-padded widths, down to none at all
+    for x, width in [(0, 0), (0, 3), (7, 1), (42, 5000), (10 ** 4999, 5000)]:
+        chunks = []
+        write_decimal(x, chunks.append, width=width)
+        assert "".join(chunks) == (str(x).zfill(width) if width else "")
+        assert all(chunks)
+
+    print(f"{'digits':>12} {'str()':>10} {'radix':>10} {'speedup':>8}")
+    for n in sizes:
+        x = random.getrandbits(int(n * 3.3219280948873626))
+
+        start = time.perf_counter()
+        expected = str(x)
+        t_str = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = to_decimal(x)
+        t_radix = time.perf_counter() - start
+
+        assert result == expected
+        print(f"{n:>12,} {t_str:>9.2f}s {t_radix:>9.2f}s {t_str / t_radix:>7.1f}x", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark subquadratic decimal conversion against str(int).")
+    parser.add_argument("sizes", type=int, nargs="*", default=[10 ** 6, 10 ** 7, 5 * 10 ** 7],
+                        help="digit counts to test (default: 1M 10M 50M)")
+    args = parser.parse_args()
+    benchmark(args.sizes)
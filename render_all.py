@@ -0,0 +1,387 @@
+"""
+Render every scene of the video in parallel.
+
+Scene classes are found by parsing the files (no manim import needed): every
+class deriving from Scene, MovingCameraScene, ... or from another scene
+class of the same file. Each scene is one `manim render` process; up to
+`workers` run at once (one per core by default), longest first according to
+the timings of earlier runs, so the whole build takes about as long as the
+slowest scene rather than the sum of them all. Scenes without a timing yet
+go first, as they may be the long ones.
+
+With --split N a long scene is also cut into up to N runs of consecutive
+play() calls, rendered side by side with manim's -n first,last in separate
+media directories. Each run still executes construct() from the top, with
+the animations before its range skipped (jumped to their end state), which
+is how every segment starts from the scene state at its first play(). The
+segment videos, each manim's own concatenation of its partial movie files,
+are then joined with ffmpeg's concat demuxer without re-encoding. The plays
+are counted beforehand by running each scene once with dry_run.
+
+Skipping is not the same as playing, though: across a skipped animation
+updaters get a single step of its whole run_time, so a scene whose updaters
+do not add up over dt (say, one that samples random numbers every frame)
+comes out different. Scenes that register updaters, themselves or through
+the code and local modules they use, are therefore rendered whole; name one
+with --split-scene once its updaters are known to depend only on state
+(a ValueTracker, the camera) to have it split too.
+
+Scenes whose inputs have not changed since they were last rendered are
+copied from the render cache (see rendercache.py) instead of rendered, so
+after editing one scene a full build costs that one scene.
+
+Every run appends its timings to TIMINGS and writes a report of the outputs,
+durations and failures (with the tail of the log for each failure):
+
+    python render_all.py                        # everything at 1080p60
+    python render_all.py --split 4              # and each scene in up to 4 segments
+    python render_all.py --split 4 --split-scene ArctanSeries
+    python render_all.py -q l -j 4 --scene ArchimedesPi --scene ArctanSeries
+    python render_all.py --dry-run              # show the schedule
+"""
+import ast
+import datetime
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import rendercache
+
+# Files with the scenes of the video
+SCENE_FILES = ["animations.py", "thumbnail.py"]
+
+# manim's -q flags and the directories their videos land in
+QUALITIES = {"l": "480p15", "m": "720p30", "h": "1080p60", "p": "1440p60", "k": "2160p60"}
+
+# The same qualities as manim's config names them
+QUALITY_NAMES = {"l": "low_quality", "m": "medium_quality", "h": "high_quality",
+                 "p": "production_quality", "k": "fourk_quality"}
+
+# Seconds per scene from earlier runs, by "file:Scene@quality"
+TIMINGS = "render_timings.json"
+
+REPORT = "render_report.json"
+
+MEDIA_DIR = "media"
+
+# Lines of a failed render's log kept in the report
+LOG_TAIL = 20
+
+# Calls and classes that register updaters; scenes using any are not split
+UPDATER_NAMES = {"add_updater", "always_redraw", "always", "f_always", "TracedPath", "turn_animation_into_updater"}
+
+
+def discover(paths):
+    """[(path, scene name)] for every Scene subclass defined in the files, in file order."""
+    scenes = []
+    for path in paths:
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        found = set()
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            bases = {b.id if isinstance(b, ast.Name) else b.attr for b in node.bases
+                     if isinstance(b, (ast.Name, ast.Attribute))}
+            if any(b.endswith("Scene") or b in found for b in bases):
+                found.add(node.name)
+                scenes.append((path, node.name))
+    return scenes
+
+
+def _key(path, scene, quality):
+    return f"{os.path.basename(path)}:{scene}@{quality}"
+
+
+def load_timings(path=TIMINGS):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_timings(timings, path=TIMINGS):
+    with open(path, "w") as f:
+        json.dump(timings, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def schedule(scenes, quality, timings):
+    """The scenes longest first; those never rendered before lead."""
+    def expected(scene):
+        seconds = timings.get(_key(*scene, quality))
+        return (seconds is not None, -(seconds or 0))
+
+    return sorted(scenes, key=expected)
+
+
+def output_path(path, scene, quality, media_dir=MEDIA_DIR):
+    module = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(media_dir, "videos", module, QUALITIES[quality], f"{scene}.mp4")
+
+
+def _load_scene(path, scene):
+    # The scene class, with the module imported from its file as manim does
+    import importlib.util
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.chdir(directory)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, os.path.abspath(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return getattr(module, scene)
+
+
+def _count_plays(path, scene, quality):
+    # Runs in a worker process: play() and wait() calls of one dry run
+    from manim import tempconfig
+
+    with tempconfig({"dry_run": True, "quality": QUALITY_NAMES[quality], "progress_bar": "none"}):
+        instance = _load_scene(path, scene)()
+        instance.render()
+        return instance.renderer.num_plays
+
+
+def count_plays(scenes, quality, workers=None):
+    """{(path, scene): number of play() calls}, from a dry run of each scene in parallel."""
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {scene: pool.submit(_count_plays, *scene, quality) for scene in scenes}
+    counts = {}
+    for scene, future in futures.items():
+        try:
+            counts[scene] = future.result()
+        except Exception:
+            # Rendered whole, which reports the error
+            counts[scene] = 0
+    return counts
+
+
+def _registers_updaters(tree):
+    for node in ast.walk(tree):
+        name = node.attr if isinstance(node, ast.Attribute) else node.id if isinstance(node, ast.Name) else None
+        if name in UPDATER_NAMES:
+            return True
+    return False
+
+
+def uses_updaters(path, scene):
+    """True if the scene, the module-level code it reaches or a local module it uses registers updaters."""
+    defs = rendercache.parse(path)[1]
+    deps = rendercache.dependencies(path, scene)
+    if any(_registers_updaters(defs[name]) for name in deps["code"] if name in defs):
+        return True
+    return any(_registers_updaters(rendercache.parse(module)[0]) for module in deps["modules"])
+
+
+def segments(plays, parts):
+    """Up to `parts` ranges (first, last) of play() numbers, inclusive, covering 0 .. plays - 1."""
+    parts = max(1, min(parts, plays))
+    bounds = [plays * i // parts for i in range(parts + 1)]
+    return [(a, b - 1) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def render_scene(path, scene, quality, media_dir=MEDIA_DIR, plays=None):
+    """
+    Render one scene in its own manim process, or only the plays (first,
+    last) of it into a media directory of their own; the report entry.
+    """
+    log_dir = os.path.join(media_dir, "logs")
+    name = scene
+    command = [sys.executable, "-m", "manim", "render", f"-q{quality}", "--progress_bar", "none"]
+    if plays is not None:
+        name = f"{scene}.{plays[0]}-{plays[1]}"
+        media_dir = os.path.join(media_dir, "segments", name)
+        command += ["-n", f"{plays[0]},{plays[1]}"]
+    command += ["--media_dir", os.path.abspath(media_dir), os.path.abspath(path), scene]
+    os.makedirs(log_dir, exist_ok=True)
+    log = os.path.join(log_dir, f"{name}.log")
+
+    start = time.perf_counter()
+    with open(log, "w") as f:
+        returncode = subprocess.call(command, stdout=f, stderr=subprocess.STDOUT,
+                                     cwd=os.path.dirname(os.path.abspath(path)))
+    seconds = time.perf_counter() - start
+
+    entry = {"file": path, "scene": scene, "seconds": round(seconds, 2), "returncode": returncode, "log": log}
+    if plays is not None:
+        entry["plays"] = list(plays)
+    if returncode == 0:
+        entry["output"] = output_path(path, scene, quality, media_dir)
+    else:
+        with open(log) as f:
+            entry["error"] = f.readlines()[-LOG_TAIL:]
+    return entry
+
+
+def concat(paths, target):
+    """Join videos with ffmpeg's concat demuxer, copying the streams as they are."""
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    listing = target + ".txt"
+    with open(listing, "w") as f:
+        for path in paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+    try:
+        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                        "-i", listing, "-c", "copy", target], check=True, capture_output=True, text=True)
+    finally:
+        os.unlink(listing)
+
+
+def _join_segments(path, scene, quality, media_dir, parts):
+    # The report entry of a scene rendered in segments, its video joined from theirs
+    parts = sorted(parts, key=lambda e: e["plays"][0])
+    entry = {"file": path, "scene": scene, "seconds": round(sum(e["seconds"] for e in parts), 2),
+             "returncode": next((e["returncode"] for e in parts if e["returncode"] != 0), 0),
+             "segments": parts}
+    if entry["returncode"] == 0:
+        entry["output"] = output_path(path, scene, quality, media_dir)
+        try:
+            concat([e["output"] for e in parts], entry["output"])
+        except subprocess.CalledProcessError as e:
+            entry.update(returncode=e.returncode, error=e.stderr.splitlines()[-LOG_TAIL:])
+        except OSError as e:
+            entry.update(returncode=-1, error=[str(e)])
+        if entry["returncode"] != 0:
+            del entry["output"]
+    else:
+        entry["error"] = next(e["error"] for e in parts if e["returncode"] != 0)
+    return entry
+
+
+def render_all(scenes, quality="h", workers=None, media_dir=MEDIA_DIR, timings_path=TIMINGS, split=1,
+               cache_dir=rendercache.CACHE_DIR, split_scenes=()):
+    """
+    Render the scenes on `workers` parallel processes, each in up to `split`
+    segments, and return the report. Scenes with updaters are rendered whole
+    unless named in split_scenes. Scenes whose video is in the render cache
+    at cache_dir (None: no cache) are copied from there instead.
+    """
+    timings = load_timings(timings_path)
+    order = schedule(scenes, quality, timings)
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    results = []
+    cache = rendercache.RenderCache(cache_dir) if cache_dir else None
+    keys = {}
+    if cache is not None:
+        for path, scene in list(order):
+            try:
+                keys[path, scene] = rendercache.fingerprint(path, scene, quality)
+            except (KeyError, SyntaxError):
+                # Rendered, so that manim reports the problem
+                continue
+            output = output_path(path, scene, quality, media_dir)
+            if cache.fetch(keys[path, scene], output):
+                order.remove((path, scene))
+                results.append({"file": path, "scene": scene, "seconds": 0, "returncode": 0,
+                                "output": output, "cached": True})
+                print(f"{scene:<28} {'cached':>9}", flush=True)
+
+    splittable = []
+    if split > 1:
+        for path, scene in order:
+            try:
+                if scene in split_scenes or not uses_updaters(path, scene):
+                    splittable.append((path, scene))
+            except (KeyError, SyntaxError):
+                continue
+    plays = count_plays(splittable, quality, workers) if splittable else {}
+    jobs = []
+    for path, scene in order:
+        ranges = segments(plays[path, scene], split) if plays.get((path, scene), 0) > 1 else [None]
+        jobs += [(path, scene, r if len(ranges) > 1 else None) for r in ranges]
+
+    pending = defaultdict(list)  # segments done so far, by scene
+    with ThreadPoolExecutor(workers) as pool:
+        futures = [pool.submit(render_scene, path, scene, quality, media_dir, r) for path, scene, r in jobs]
+        expected = defaultdict(int)
+        for path, scene, _ in jobs:
+            expected[path, scene] += 1
+        for future in as_completed(futures):
+            entry = future.result()
+            key = (entry["file"], entry["scene"])
+            if "plays" in entry:
+                pending[key].append(entry)
+                if len(pending[key]) < expected[key]:
+                    continue
+                entry = _join_segments(*key, quality, media_dir, pending.pop(key))
+            results.append(entry)
+            status = "ok" if entry["returncode"] == 0 else f"FAILED ({entry['returncode']})"
+            pieces = f" in {len(entry['segments'])} segments" if "segments" in entry else ""
+            print(f"{entry['scene']:<28} {entry['seconds']:>8.1f}s{pieces}  {status}", flush=True)
+            if entry["returncode"] == 0:
+                timings[_key(entry["file"], entry["scene"], quality)] = entry["seconds"]
+                if key in keys:
+                    cache.store(keys[key], entry["output"])
+    wall = time.perf_counter() - start
+    save_timings(timings, timings_path)
+
+    results.sort(key=lambda e: scenes.index((e["file"], e["scene"])))
+    total = sum(e["seconds"] for e in results)
+    return {
+        "quality": QUALITIES[quality],
+        "workers": workers,
+        "split": split,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "wall_seconds": round(wall, 2),
+        "scene_seconds": round(total, 2),
+        "slowest_seconds": max((e["seconds"] for e in results), default=0),
+        "cached": [e["scene"] for e in results if e.get("cached")],
+        "failed": [e["scene"] for e in results if e["returncode"] != 0],
+        "scenes": results,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render every scene of the video in parallel.")
+    parser.add_argument("files", nargs="*", default=SCENE_FILES,
+                        help=f"files with the scenes (default: {' '.join(SCENE_FILES)})")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="h", help="manim quality (default: h, 1080p60)")
+    parser.add_argument("-j", "--workers", type=int, help="scenes rendered at once (default: one per core)")
+    parser.add_argument("-s", "--scene", action="append", help="only this scene (repeatable)")
+    parser.add_argument("--media-dir", default=MEDIA_DIR, help=f"manim media directory (default: {MEDIA_DIR})")
+    parser.add_argument("--timings", default=TIMINGS, help=f"timings of earlier runs (default: {TIMINGS})")
+    parser.add_argument("--report", default=REPORT, help=f"where to write the report (default: {REPORT})")
+    parser.add_argument("--split", type=int, default=1, metavar="N",
+                        help="render each scene in up to N segments of play() calls at once (default: 1)")
+    parser.add_argument("--split-scene", action="append", default=[], metavar="SCENE",
+                        help="split this scene even though it has updaters (repeatable)")
+    parser.add_argument("--no-cache", action="store_true", help="render every scene, even those in the render cache")
+    parser.add_argument("--dry-run", action="store_true", help="print the schedule without rendering")
+    args = parser.parse_args()
+
+    scenes = discover(args.files)
+    unknown = (set(args.scene or []) | set(args.split_scene)) - {name for _, name in scenes}
+    if unknown:
+        parser.error(f"no such scene: {', '.join(sorted(unknown))}")
+    if args.scene:
+        scenes = [s for s in scenes if s[1] in args.scene]
+
+    if args.dry_run:
+        timings = load_timings(args.timings)
+        for path, scene in schedule(scenes, args.quality, timings):
+            seconds = timings.get(_key(path, scene, args.quality))
+            print(f"{path + ':' + scene:<44} {'?' if seconds is None else f'{seconds:.1f}s':>8}")
+        raise SystemExit(0)
+
+    report = render_all(scenes, args.quality, args.workers, args.media_dir, args.timings, args.split,
+                        None if args.no_cache else rendercache.CACHE_DIR, set(args.split_scene))
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"{len(report['scenes'])} scenes in {report['wall_seconds']:.1f}s on {report['workers']} workers "
+          f"({report['scene_seconds']:.1f}s of rendering, slowest {report['slowest_seconds']:.1f}s) -> {args.report}")
+    if report["failed"]:
+        print(f"failed: {', '.join(report['failed'])}")
+        raise SystemExit(1)
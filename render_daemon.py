@@ -0,0 +1,240 @@
+"""
+Render server that keeps manim warm between renders.
+
+Most of a short scene's render is start-up: the interpreter, `from manim
+import *`, the config and LaTeX template setup, and importing the project
+modules. The server does all that once, then takes jobs over a Unix socket
+and forks a child per job, which inherits the warm process, renders the one
+scene with the requested quality and exits, so nothing a scene changes
+(config, module state) carries over to the next. Scene files and the local
+modules they use are re-imported only when one of them has changed on disk.
+Scenes found in the render cache (rendercache.py) are answered from it
+without forking at all.
+
+    python render_daemon.py serve &
+    python render_daemon.py render Blank -q l
+    python render_daemon.py render ArchimedesPi --file animations.py -q h
+    python render_daemon.py stop
+
+One request per connection, a JSON line each way:
+
+    {"file": "animations.py", "scene": "Blank", "quality": "l"}
+    {"ok": true, "output": ".../Blank.mp4", "seconds": 0.31, "cached": false}
+"""
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+import rendercache
+from render_all import QUALITY_NAMES, SCENE_FILES, output_path
+
+# Where the server listens
+SOCKET = os.environ.get("PI_RENDER_SOCKET", os.path.join(tempfile.gettempdir(), f"pi-render-{os.getuid()}.sock"))
+
+MEDIA_DIR = "media"
+
+
+class _Project:
+    """The scene modules, imported in the server and re-imported when their files change."""
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.modules = {}  # scene file -> module
+        self.mtimes = {}   # local module file -> mtime when imported
+        # The server's own local modules (this one, render_all, rendercache)
+        # are never re-imported
+        self.own = set(self._local_files())
+
+    def _local_files(self):
+        files = []
+        for module in list(sys.modules.values()):
+            path = getattr(module, "__file__", None)
+            if path and os.path.dirname(os.path.abspath(path)) == self.directory and path.endswith(".py"):
+                files.append(os.path.abspath(path))
+        return files
+
+    def _stale(self):
+        for path, mtime in self.mtimes.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+    def module(self, path):
+        """The module of a scene file, up to date with every local file it uses."""
+        path = os.path.abspath(path)
+        if self._stale():
+            # Drop the scene modules and the local modules they imported, so
+            # they are all imported afresh
+            for name, module in list(sys.modules.items()):
+                file = getattr(module, "__file__", None)
+                if file and os.path.abspath(file) in self.mtimes:
+                    del sys.modules[name]
+            self.modules.clear()
+            self.mtimes.clear()
+        if path not in self.modules:
+            import importlib.util
+
+            name = os.path.splitext(os.path.basename(path))[0]
+            spec = importlib.util.spec_from_file_location(name, path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            spec.loader.exec_module(module)
+            self.modules[path] = module
+            for file in self._local_files() + [path]:
+                if file not in self.own:
+                    self.mtimes.setdefault(file, os.stat(file).st_mtime_ns)
+        return self.modules[path]
+
+
+def _render_child(module, scene, quality, media_dir, out):
+    # In the forked child: render, report through the pipe `out`, exit
+    from manim import config
+
+    try:
+        config.quality = QUALITY_NAMES[quality]
+        config.media_dir = media_dir
+        # manim names the video directory after the input file, as with
+        # `manim render`, so the video lands where render_all and the cache put it
+        config.input_file = module.__file__
+        instance = getattr(module, scene)()
+        instance.render()
+        output = str(instance.renderer.file_writer.movie_file_path)
+        expected = output_path(module.__file__, scene, quality, media_dir)
+        if os.path.abspath(output) != os.path.abspath(expected):
+            raise RuntimeError(f"manim wrote {output}, not {expected}")
+        result = {"ok": True, "output": expected}
+        status = 0
+    except BaseException:
+        result = {"ok": False, "error": traceback.format_exc()}
+        status = 1
+    with os.fdopen(out, "w") as f:
+        json.dump(result, f)
+    os._exit(status)
+
+
+class RenderServer(socketserver.UnixStreamServer):
+    """Takes render jobs on a Unix socket, one at a time, each in a forked child."""
+
+    def __init__(self, socket_path=SOCKET, directory=".", media_dir=MEDIA_DIR, cache_dir=rendercache.CACHE_DIR):
+        self.project = _Project(directory)
+        self.media_dir = os.path.abspath(media_dir)
+        self.cache = rendercache.RenderCache(cache_dir) if cache_dir else None
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _Handler)
+
+    def warm_up(self, paths=()):
+        """Import manim and the scene files and typeset once, so the first job does not pay for it."""
+        from manim import MathTex, tempconfig
+
+        for path in paths:
+            self.project.module(path)
+        with tempconfig({"media_dir": self.media_dir}):
+            MathTex(r"\pi")
+
+    def render(self, path, scene, quality="h"):
+        """Render one scene in a forked child; the response for the client."""
+        start = time.perf_counter()
+        key = None
+        if self.cache is not None:
+            try:
+                key = rendercache.fingerprint(path, scene, quality)
+            except (KeyError, SyntaxError):
+                pass
+            output = output_path(path, scene, quality, self.media_dir)
+            if key is not None and self.cache.fetch(key, output):
+                return {"ok": True, "output": output, "seconds": time.perf_counter() - start, "cached": True}
+
+        try:
+            module = self.project.module(path)
+        except BaseException:
+            return {"ok": False, "error": traceback.format_exc()}
+        if not hasattr(module, scene):
+            return {"ok": False, "error": f"{path}: no scene {scene}"}
+
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            _render_child(module, scene, quality, self.media_dir, write)
+        os.close(write)
+        with os.fdopen(read) as f:
+            data = f.read()
+        os.waitpid(pid, 0)
+        result = json.loads(data) if data else {"ok": False, "error": "render process died"}
+        result.update(seconds=time.perf_counter() - start, cached=False)
+        if result["ok"] and key is not None:
+            self.cache.store(key, result["output"])
+        return result
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        if request.get("stop"):
+            self.wfile.write(b'{"ok": true}\n')
+            # shutdown() waits for serve_forever(), which is running this handler
+            threading.Thread(target=self.server.shutdown).start()
+            return
+        response = self.server.render(request["file"], request["scene"], request.get("quality", "h"))
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def request(message, socket_path=SOCKET):
+    """Send one request to the server and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(socket_path)
+        s.sendall(json.dumps(message).encode() + b"\n")
+        with s.makefile() as f:
+            return json.loads(f.readline())
+
+
+def render(scene, quality="h", path="animations.py", socket_path=SOCKET):
+    """Have the server render a scene; its response."""
+    return request({"file": os.path.abspath(path), "scene": scene, "quality": quality}, socket_path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render scenes through a server that keeps manim loaded.")
+    parser.add_argument("--socket", default=SOCKET, help=f"server socket (default: {SOCKET})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("serve", help="run the server")
+    p.add_argument("--media-dir", default=MEDIA_DIR, help=f"manim media directory (default: {MEDIA_DIR})")
+    p.add_argument("--no-cache", action="store_true", help="do not use the render cache")
+    p.add_argument("files", nargs="*", default=SCENE_FILES, help="scene files to import up front")
+    p = commands.add_parser("render", help="render a scene with the running server")
+    p.add_argument("scene")
+    p.add_argument("--file", default="animations.py", help="file with the scene (default: animations.py)")
+    p.add_argument("-q", "--quality", choices=QUALITY_NAMES, default="h", help="manim quality (default: h)")
+    commands.add_parser("stop", help="stop the server")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = RenderServer(args.socket, media_dir=args.media_dir,
+                              cache_dir=None if args.no_cache else rendercache.CACHE_DIR)
+        server.warm_up(args.files)
+        print(f"listening on {args.socket}", flush=True)
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            os.unlink(args.socket)
+    elif args.command == "stop":
+        request({"stop": True}, args.socket)
+    else:
+        response = render(args.scene, args.quality, args.file, args.socket)
+        if not response["ok"]:
+            raise SystemExit(response["error"])
+        print(f"{args.scene}: {'cached' if response['cached'] else 'rendered'} in {response['seconds']:.2f}s "
+              f"-> {response['output']}")
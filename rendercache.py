@@ -0,0 +1,259 @@
+"""
+Scene-level render cache: a finished video, keyed on everything that goes
+into it.
+
+The key of a scene is a SHA-256 over
+
+    the AST of its class (so comments and formatting do not count),
+    the module-level code it reaches: functions, classes and constants it
+    names, followed transitively, plus the module's top-level statements
+    such as config.background_color = ...,
+    the local modules it uses (pidigits.py, archimedes.py, ...), whole and
+    with the local modules they import in turn,
+    the contents of the files its string constants name (ImageMobject
+    images, looked up next to the scene file and in images/),
+    the render quality and the installed manim version.
+
+Working the key out only parses files, so on a hit the video is copied into
+place without manim being imported at all, let alone construct() run.
+render_all.py checks the cache before rendering each scene and stores what
+it renders:
+
+    python rendercache.py animations.py ArchimedesPi -q h     # print a key and its inputs
+"""
+import ast
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Where cached videos are kept
+CACHE_DIR = ".render_cache"
+
+# Directories searched for files named in the scenes, relative to the scene file
+ASSET_DIRS = ["", "images"]
+
+
+@functools.lru_cache(maxsize=64)
+def _parse(path, mtime_ns):
+    # (tree, {top-level name: defining statement}, {name: imported module},
+    # top-level statements that run on import)
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    defs, imports, preamble = {}, {}, []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defs[node.name] = node
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports[alias.asname or alias.name.split(".")[0]] = alias.name
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                imports[alias.asname or alias.name] = node.module
+        elif isinstance(node, ast.If) and "__name__" in ast.dump(node.test):
+            continue
+        else:
+            preamble.append(node)
+            targets = node.targets if isinstance(node, ast.Assign) else [getattr(node, "target", None)]
+            for target in targets:
+                for name in ast.walk(target) if target is not None else ():
+                    if isinstance(name, ast.Name):
+                        defs[name.id] = node
+    return tree, defs, imports, preamble
+
+
+def parse(path):
+    return _parse(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+
+def _dump(node):
+    return ast.dump(node, include_attributes=False)
+
+
+def _digest(data):
+    return hashlib.sha256(data.encode() if isinstance(data, str) else data).hexdigest()
+
+
+def _local_module(directory, name):
+    path = os.path.join(directory, *name.split(".")) + ".py"
+    return path if name and os.path.exists(path) else None
+
+
+@functools.lru_cache(maxsize=256)
+def _module_info(path, mtime_ns):
+    # (AST digest, local modules imported anywhere in it) of a local module
+    tree = _parse(path, mtime_ns)[0]
+    directory = os.path.dirname(path)
+    imported = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            names = [node.module]
+        else:
+            continue
+        imported += [local for local in (_local_module(directory, name) for name in names) if local]
+    return _digest(_dump(tree)), imported
+
+
+def _module_closure(path, seen=None):
+    # {module path: AST digest} for a local module and every local module it
+    # imports, transitively
+    seen = {} if seen is None else seen
+    path = os.path.abspath(path)
+    if path in seen:
+        return seen
+    seen[path], imported = _module_info(path, os.stat(path).st_mtime_ns)
+    for local in imported:
+        _module_closure(local, seen)
+    return seen
+
+
+def dependencies(path, scene):
+    """
+    What the scene's video depends on, as {"code": {name: AST dump},
+    "modules": {path: digest}, "files": [paths]}.
+    """
+    tree, defs, imports, preamble = parse(path)
+    if not isinstance(defs.get(scene), ast.ClassDef):
+        raise KeyError(f"{path}: no class {scene}")
+    directory = os.path.dirname(os.path.abspath(path))
+
+    code = {"<module>": "\n".join(_dump(node) for node in preamble)}
+    modules = {}
+    strings = set()
+    pending = [scene] + [name for node in preamble for name in _names(node)]
+    while pending:
+        name = pending.pop()
+        if name in code:
+            continue
+        if name in defs:
+            node = defs[name]
+            code[name] = _dump(node)
+            pending.extend(_names(node))
+            strings.update(n.value for n in ast.walk(node) if isinstance(n, ast.Constant) and isinstance(n.value, str))
+        elif name in imports:
+            code[name] = f"import {imports[name]}"
+            local = _local_module(directory, imports[name])
+            if local:
+                _module_closure(local, modules)
+
+    files = set()
+    for s in strings:
+        if len(s) > 255 or "\n" in s:
+            continue
+        for sub in ASSET_DIRS:
+            candidate = os.path.join(directory, sub, s)
+            if os.path.isfile(candidate):
+                files.add(candidate)
+                break
+    return {"code": code, "modules": modules, "files": sorted(files)}
+
+
+def _names(node, local=frozenset()):
+    # The names a piece of code reads from module level; inside a function
+    # the names it assigns or takes as arguments are its own
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+        local = local | {n.id for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+        local = local | {a.arg for a in ast.walk(node.args) if isinstance(a, ast.arg)}
+    names = set()
+    if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in local:
+        names.add(node.id)
+    for child in ast.iter_child_nodes(node):
+        names |= _names(child, local)
+    return names
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path, mtime_ns, size):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _manim_version():
+    from importlib import metadata
+
+    try:
+        return metadata.version("manim")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def inputs(path, scene, quality=None):
+    """The key material of a scene: its dependencies with the files hashed, quality and manim version."""
+    deps = dependencies(path, scene)
+    directory = os.path.dirname(os.path.abspath(path))
+    files = {}
+    for f in deps["files"]:
+        st = os.stat(f)
+        files[os.path.relpath(f, directory)] = _file_digest(f, st.st_mtime_ns, st.st_size)
+    return {
+        "scene": scene,
+        "code": {name: _digest(dump) for name, dump in deps["code"].items()},
+        "modules": {os.path.relpath(p, directory): d for p, d in deps["modules"].items()},
+        "files": files,
+        "quality": quality,
+        "manim": _manim_version(),
+    }
+
+
+def fingerprint(path, scene, quality=None):
+    """The cache key of a scene: a hex SHA-256 of inputs()."""
+    return _digest(json.dumps(inputs(path, scene, quality), sort_keys=True))
+
+
+class RenderCache:
+    """Finished videos by fingerprint, in `directory`."""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.mp4")
+
+    def fetch(self, key, target):
+        """Copy the video cached under key to target; False on a miss."""
+        cached = self._path(key)
+        if not os.path.exists(cached):
+            return False
+        if not (os.path.exists(target) and os.path.samefile(cached, target)):
+            _copy(cached, target)
+        return True
+
+    def store(self, key, video):
+        """Keep a copy of a rendered video under key."""
+        _copy(video, self._path(key))
+
+
+def _copy(source, target):
+    # Copy next to target, then rename over it
+    directory = os.path.dirname(os.path.abspath(target))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show the render cache key of a scene and what goes into it.")
+    parser.add_argument("file")
+    parser.add_argument("scene")
+    parser.add_argument("-q", "--quality", default="h", help="manim quality (default: h)")
+    args = parser.parse_args()
+
+    material = inputs(args.file, args.scene, args.quality)
+    print(json.dumps(material, indent=2, sort_keys=True))
+    print(fingerprint(args.file, args.scene, args.quality))
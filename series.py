@@ -0,0 +1,258 @@
+"""
+Binary splitting for hypergeometric-type series (Haible & Papanikolaou).
+
+A series is given by three integer-valued functions of the term index:
+
+    S = sum_{n>=0} a(n) * p(0) p(1) ... p(n) / (q(0) q(1) ... q(n))
+
+Over a range of terms [a, b) this is kept as the integer triple
+
+    P = p(a) ... p(b-1),  Q = q(a) ... q(b-1),  T = Q * (partial sum from a)
+
+and two adjacent ranges merge with four multiplications, so the whole sum
+is a balanced product tree that runs in O(M(n) log n) instead of n big
+divisions. The tree can be mapped over a process pool and checkpointed (see
+checkpoint.py), for any series defined here:
+
+    CHUDNOVSKY   1/pi = 12 / 640320^(3/2) * sum (-1)^n (6n)! (13591409 + 545140134n) / ((3n)! (n!)^3 640320^(3n))
+    RAMANUJAN    1/pi = 2 sqrt(2) / 9801 * sum (4n)! (1103 + 26390n) / ((n!)^4 396^(4n))
+    arctan(x)    arctan(1/x) = x / (x^2 + 1) * sum (2^n n!)^2 / (2n + 1)! / (x^2 + 1)^n
+
+arctan uses Euler's form rather than the alternating Gregory series shown in
+the ArctanSeries scene: every term is positive and it converges just as fast.
+"""
+import functools
+import math
+import operator
+from concurrent.futures import ProcessPoolExecutor
+
+# Chudnovsky constants
+A = 13591409
+B = 545140134
+C = 640320
+C3_OVER_24 = C ** 3 // 24
+
+# The parallel split hands each worker this many leaf ranges, so a slow
+# range doesn't leave the other cores idle at the end of the leaf level
+LEAVES_PER_WORKER = 4
+
+# Leaf ranges of a checkpointed run. Kept independent of the worker count
+# (up to 64 workers) so a job restarted on another box still finds its files
+CHECKPOINT_LEAVES = 256
+
+# Leading ranges [0, 2**k) up to this many terms are kept in memory once
+# computed, so asking for a few more digits only splits the new terms
+MEMO_MAX_TERMS = 1 << 12
+
+
+def merge(left, right, mul=operator.mul):
+    """Combine the (P, Q, T) triples of two adjacent term ranges."""
+    P1, Q1, T1 = left
+    P2, Q2, T2 = right
+    return mul(P1, P2), mul(Q1, Q2), mul(Q2, T1) + mul(P1, T2)
+
+
+def _tree(a, b, leaves):
+    # Ranges of the splitting tree level by level, from the leaves up. A node
+    # left over at the end of a level is carried up unchanged
+    bounds = [a + (b - a) * i // leaves for i in range(leaves + 1)]
+    levels = [list(zip(bounds[:-1], bounds[1:]))]
+    while len(levels[-1]) > 1:
+        prev = levels[-1]
+        levels.append([(prev[i][0], prev[min(i + 1, len(prev) - 1)][1]) for i in range(0, len(prev), 2)])
+    return levels
+
+
+class Series:
+    """
+    A series sum a(n) p(0)...p(n) / (q(0)...q(n)) to evaluate by binary splitting.
+
+    a, p and q have to be picklable (module-level functions or partials of
+    them) for the parallel split. digits_per_term is the asymptotic
+    log10 |q(n) / p(n)|, which decides how many terms a precision needs.
+    """
+
+    def __init__(self, name, a, p, q, digits_per_term):
+        self.name = name
+        self.a = a
+        self.p = p
+        self.q = q
+        self.digits_per_term = digits_per_term
+        self._memo = {}
+
+    def __repr__(self):
+        return f"Series({self.name!r})"
+
+    def __getstate__(self):
+        # Workers get the definition, not the memo
+        state = self.__dict__.copy()
+        state["_memo"] = {}
+        return state
+
+    def terms(self, digits):
+        """Number of terms needed for `digits` correct digits."""
+        return int(digits / self.digits_per_term) + 2
+
+    def bs(self, a, b, mul=operator.mul):
+        """The (P, Q, T) triple of the term range [a, b), big products done with `mul`."""
+        if b - a == 1:
+            P = self.p(a)
+            return P, self.q(a), self.a(a) * P
+        if a == 0 and b in self._memo:
+            return self._memo[b]
+
+        # Split at a power of two, so the leading ranges are the same for
+        # every b and the memo can serve them
+        m = a + (1 << ((b - a - 1).bit_length() - 1))
+        result = merge(self.bs(a, m, mul), self.bs(m, b, mul), mul)
+        if a == 0 and b <= MEMO_MAX_TERMS and b & (b - 1) == 0:
+            self._memo[b] = result
+        return result
+
+    def tree(self, a, b, leaves, pool=None, checkpoints=None, mul=operator.mul):
+        """
+        Same result as bs(a, b), evaluated as an explicit tree over `leaves` leaf
+        ranges: the leaves are split independently, then merged pairwise up the
+        tree one level at a time. Leaves and merges are mapped over `pool` when
+        one is given; the last merge always runs in this process.
+
+        With a CheckpointStore (see checkpoint.py) every finished node is saved
+        and its children's files dropped. On a rerun the highest saved node on
+        each path is loaded and nothing below it is recomputed.
+        """
+        pool_map = pool.map if pool is not None else map
+        levels = _tree(a, b, min(b - a, leaves))
+        done = {}
+
+        def save(node, children=()):
+            if checkpoints is not None and checkpoints.save(*node, done[node]):
+                for child in children:
+                    checkpoints.discard(*child)
+
+        # Walk down from the root, stopping at anything already on disk
+        todo = []
+        stack = [(len(levels) - 1, 0)]
+        while stack:
+            depth, i = stack.pop()
+            node = levels[depth][i]
+            saved = checkpoints.load(*node) if checkpoints is not None else None
+            if saved is not None:
+                done[node] = saved
+            elif depth == 0:
+                todo.append(node)
+            else:
+                stack.extend((depth - 1, j) for j in (2 * i, 2 * i + 1) if j < len(levels[depth - 1]))
+
+        if todo:
+            starts, ends = zip(*todo)
+            for node, result in zip(todo, pool_map(self.bs, starts, ends, [mul] * len(todo))):
+                done[node] = result
+                save(node)
+
+        for depth in range(1, len(levels)):
+            prev = levels[depth - 1]
+            pending = []
+            for i, node in enumerate(levels[depth]):
+                children = [prev[j] for j in (2 * i, 2 * i + 1) if j < len(prev)]
+                if node in done or not all(child in done for child in children):
+                    continue
+                if len(children) == 1:
+                    done[node] = done[children[0]]
+                else:
+                    pending.append((node, children))
+
+            merge_map = pool_map if len(pending) > 1 else map
+            lefts = [done[left] for _, (left, right) in pending]
+            rights = [done[right] for _, (left, right) in pending]
+            muls = [mul] * len(pending)
+            for (node, children), result in zip(pending, merge_map(merge, lefts, rights, muls)):
+                done[node] = result
+                save(node, children)
+                for child in children:
+                    del done[child]
+
+        return done[levels[-1][0]]
+
+    def parallel(self, a, b, workers, checkpoints=None, mul=operator.mul):
+        """
+        Same result as bs(a, b), computed on a pool of `workers` processes.
+        `mul` is sent to the workers, so it has to be a picklable module-level
+        function (for fftmul.multiply, call fftmul.prepare() first).
+        """
+        leaves = workers * LEAVES_PER_WORKER
+        if checkpoints is not None:
+            leaves = max(leaves, CHECKPOINT_LEAVES)
+        with ProcessPoolExecutor(workers) as pool:
+            return self.tree(a, b, leaves, pool, checkpoints, mul)
+
+    def evaluate(self, digits, workers=1, checkpoints=None, mul=None):
+        """
+        The (P, Q, T) triple over just enough terms for `digits` digits:
+        serial, on `workers` processes, or checkpointed into a CheckpointStore.
+        """
+        mul = mul or operator.mul
+        terms = self.terms(digits)
+        if workers > 1:
+            return self.parallel(0, terms, workers, checkpoints, mul)
+        if checkpoints is not None:
+            return self.tree(0, terms, CHECKPOINT_LEAVES, checkpoints=checkpoints, mul=mul)
+        return self.bs(0, terms, mul)
+
+
+def _one(n):
+    return 1
+
+
+def _chudnovsky_a(n):
+    return -(A + B * n) if n & 1 else A + B * n
+
+
+def _chudnovsky_p(n):
+    return (6 * n - 5) * (2 * n - 1) * (6 * n - 1) if n else 1
+
+
+def _chudnovsky_q(n):
+    return n * n * n * C3_OVER_24 if n else 1
+
+
+def _ramanujan_a(n):
+    return 1103 + 26390 * n
+
+
+def _ramanujan_p(n):
+    # (4n)! / (4n-4)! / n, the other n going into q
+    return 8 * (4 * n - 3) * (2 * n - 1) * (4 * n - 1) if n else 1
+
+
+def _ramanujan_q(n):
+    return n * n * n * 396 ** 4 if n else 1
+
+
+def _arctan_p(n):
+    return 2 * n if n else 1
+
+
+def _arctan_q(x2, n):
+    return (2 * n + 1) * (x2 + 1) if n else 1
+
+
+CHUDNOVSKY = Series("chudnovsky", _chudnovsky_a, _chudnovsky_p, _chudnovsky_q, math.log10(C3_OVER_24 / 72))
+
+RAMANUJAN = Series("ramanujan", _ramanujan_a, _ramanujan_p, _ramanujan_q, math.log10(396 ** 4 / 256))
+
+
+@functools.lru_cache(maxsize=None)
+def arctan(x):
+    """The series for arctan(1/x), x a positive integer."""
+    return Series(f"arctan-{x}", _one, _arctan_p, functools.partial(_arctan_q, x * x), math.log10(x * x + 1))
+
+
+def arctan_fixed(x, bits, workers=1, mul=None):
+    """floor(arctan(1/x) * 2**bits), give or take a unit."""
+    from pidigits import divide
+
+    mul = mul or operator.mul
+    _, Q, T = arctan(x).evaluate(bits * math.log10(2) + 2, workers, mul=mul)
+    # Only the leading bits of Q and T matter for the quotient
+    shift = max(0, min(Q.bit_length(), T.bit_length()) - bits - 64)
+    return divide(x * (T >> shift) << bits, (x * x + 1) * (Q >> shift), mul)
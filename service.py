@@ -0,0 +1,229 @@
+"""
+Background digit service, so scene construction never waits on a computation.
+
+construct() runs top to bottom, and a scene that needs a block of digits
+would stall on it. Here digits are requested at the top of the scene and
+come back as futures, resolved only where the mobjects are built:
+
+    def construct(self):
+        pending = service.digits(0, 300)    # starts computing right away
+        ...                                 # intro animations render meanwhile
+        lines = pidigits.grouped_lines(300, digits=pending.result())
+
+The computation runs in a worker process, so it overlaps with Tex
+compilation and frame rendering here. Results are cached on disk, one packed
+digit store per precision (rounded up to a power of two) and one small file
+per BBP extraction, so on a warm cache a request is answered from disk
+without starting a worker at all.
+
+    python service.py 100000 --hex 1000000     # warm the cache before rendering
+"""
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# Where computed digits are kept between renders
+CACHE_DIR = os.path.expanduser(os.environ.get("PI_DIGITS_CACHE", "~/.cache/pi-digits"))
+
+# Smallest precision computed; smaller requests are sliced from it
+MIN_PRECISION = 1 << 10
+
+STORE_NAME = re.compile(r"pi-(\d+)\.digits$")
+
+
+def _precision(n):
+    return max(MIN_PRECISION, 1 << (n - 1).bit_length())
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _then(future, f):
+    # Future of f(result of future), without tying up a thread to wait
+    chained = Future()
+
+    def done(source):
+        try:
+            chained.set_result(f(source.result()))
+        except BaseException as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(done)
+    return chained
+
+
+def _replace_atomically(path, write):
+    # write(tmp) next to path, then rename over it
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _compute_store(path, n):
+    # Runs in the worker process
+    import pidigits
+
+    _replace_atomically(path, lambda tmp: pidigits.write_store(tmp, n))
+    return path
+
+
+def _compute_hex(path, position, count):
+    # Runs in the worker process
+    import bbp
+
+    hexits = bbp.hex_digits(position, count)
+
+    def write(tmp):
+        with open(tmp, "w") as f:
+            f.write(hexits)
+
+    _replace_atomically(path, write)
+    return hexits
+
+
+def _read(path, start, count):
+    from digitstore import DigitStore
+
+    with DigitStore(path) as store:
+        return store[start:start + count]
+
+
+class DigitService:
+    """
+    Hands out digits of pi as futures, computing them in a background
+    process and caching them in `cache_dir`. Requests for the same or a
+    smaller precision share one computation.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, workers=1):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = {}  # precision or (position, count) -> future
+
+    def _submit(self, fn, *args):
+        # The worker process only starts once something has to be computed
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        return self._executor.submit(fn, *args)
+
+    def _cached_store(self, n):
+        # Path of the smallest cached store with at least n decimals
+        best = None
+        for name in os.listdir(self.cache_dir):
+            match = STORE_NAME.match(name)
+            if match and int(match.group(1)) >= n and (best is None or int(match.group(1)) < best):
+                best = int(match.group(1))
+        return None if best is None else os.path.join(self.cache_dir, f"pi-{best}.digits")
+
+    def store(self, n):
+        """Future of the path of a digit store holding at least n decimals."""
+        with self._lock:
+            path = self._cached_store(n)
+            if path is not None:
+                return _done(path)
+            for key, future in self._pending.items():
+                if isinstance(key, int) and key >= n:
+                    return future
+
+            precision = _precision(n)
+            future = self._submit(_compute_store, os.path.join(self.cache_dir, f"pi-{precision}.digits"), precision)
+            self._pending[precision] = future
+        # Outside the lock: a future that is already done runs the callback
+        # right here, and _forget takes the lock
+        future.add_done_callback(lambda done: self._forget(precision, done))
+        return future
+
+    def digits(self, start, count):
+        """Future of the decimals [start, start + count) after the point, as a string."""
+        return _then(self.store(start + count), lambda path: _read(path, start, count))
+
+    def hex_digits(self, position, count=8):
+        """Future of bbp.hex_digits(position, count)."""
+        path = os.path.join(self.cache_dir, f"bbp-{position}-{count}.hex")
+        key = (position, count)
+        with self._lock:
+            if os.path.exists(path):
+                with open(path) as f:
+                    return _done(f.read())
+            if key in self._pending:
+                return self._pending[key]
+            future = self._pending[key] = self._submit(_compute_hex, path, position, count)
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        # Unless a newer computation has taken the key since
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def close(self):
+        """Wait for running computations and stop the worker process."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default = None
+
+
+def default_service():
+    """The service shared by every scene in this process."""
+    global _default
+    if _default is None:
+        _default = DigitService()
+    return _default
+
+
+def store(n):
+    """default_service().store(n)"""
+    return default_service().store(n)
+
+
+def digits(start, count):
+    """default_service().digits(start, count)"""
+    return default_service().digits(start, count)
+
+
+def hex_digits(position, count=8):
+    """default_service().hex_digits(position, count)"""
+    return default_service().hex_digits(position, count)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Fill the digit cache used by the scenes.")
+    parser.add_argument("n", type=int, nargs="?", default=MIN_PRECISION,
+                        help=f"decimals to have cached (default: {MIN_PRECISION})")
+    parser.add_argument("--hex", type=int, nargs="*", default=[], metavar="POSITION",
+                        help="also cache BBP hex digits at these positions")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"cache directory (default: {CACHE_DIR})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with DigitService(args.cache_dir) as svc:
+        futures = [svc.store(args.n)] + [svc.hex_digits(p) for p in args.hex]
+        for future in futures:
+            future.result()
+    print(f"cache ready in {time.perf_counter() - start:.2f}s -> {args.cache_dir}")
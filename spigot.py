@@ -0,0 +1,57 @@
+"""
+Streaming digits of pi.
+
+Gibbons' unbounded spigot (2006) yields the decimal digits one at a time,
+with no digit count fixed in advance: the first digit is there immediately
+and each next one costs a few small-integer steps. The state only grows
+with the number of digits already produced, so it suits lazy reveals of a
+few hundred or thousand digits; for millions use pidigits.py.
+
+    >>> "".join(map(str, itertools.islice(digits(), 6)))
+    '314159'
+"""
+import itertools
+
+
+def digits():
+    """Yield 3, 1, 4, 1, 5, 9, ... forever."""
+    q, r, t, k, n, l = 1, 0, 1, 1, 3, 3
+    while True:
+        if 4 * q + r - t < n * t:
+            # The next digit is settled
+            yield n
+            q, r, n = 10 * q, 10 * (r - n * t), (10 * (3 * q + r)) // t - 10 * n
+        else:
+            # Take in one more term of the series
+            n = (q * (7 * k + 2) + r * l) // (t * l)
+            q, r, t, k, l = q * k, (2 * q + r) * l, t * l, k + 1, l + 2
+
+
+def chars():
+    """Yield pi as characters: "3", ".", "1", "4", ..."""
+    stream = digits()
+    yield str(next(stream))
+    yield "."
+    for d in stream:
+        yield str(d)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Stream the digits of pi as they are produced.")
+    parser.add_argument("n", type=int, nargs="?", help="stop after this many decimals (default: never)")
+    args = parser.parse_args()
+
+    stream = chars()
+    if args.n is not None:
+        stream = itertools.islice(stream, args.n + 2)
+    try:
+        for i, c in enumerate(stream):
+            sys.stdout.write(c)
+            if i % 50 == 1:
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    sys.stdout.write("\n")
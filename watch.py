@@ -0,0 +1,146 @@
+"""
+Re-render the scenes an edit touches, as soon as the file is saved.
+
+The watcher polls the scene files and everything their scenes depend on
+(local modules, images). When one changes it works out the render cache
+fingerprint of every scene again (rendercache.py: the class's AST and the
+module-level code, modules and files it reaches), which only parses the
+changed file, and queues just the scenes whose fingerprint moved, at preview
+quality. Editing one scene re-renders that scene; editing a helper
+re-renders the scenes that use it; comments and formatting re-render
+nothing.
+
+Renders run one at a time on a background thread, through the render server
+(render_daemon.py) when one is listening, otherwise as a manim process, and a
+scene edited again while queued is rendered once.
+
+    python render_daemon.py serve &     # optional, for sub-second previews
+    python watch.py                     # animations.py and thumbnail.py at -ql
+"""
+import os
+import queue
+import threading
+import time
+
+import render_all
+import render_daemon
+import rendercache
+
+# Seconds between checks of the files
+POLL = 0.5
+
+
+def fingerprints(paths):
+    """{(path, scene): fingerprint} for every scene in the files; raises SyntaxError mid-edit."""
+    return {(path, scene): rendercache.fingerprint(path, scene)
+            for path, scene in render_all.discover(paths)}
+
+
+def watched_files(paths, scenes):
+    """The scene files and every local module and file their scenes depend on."""
+    files = {os.path.abspath(p) for p in paths}
+    for path, scene in scenes:
+        deps = rendercache.dependencies(path, scene)
+        files.update(deps["modules"])
+        files.update(deps["files"])
+    return files
+
+
+def _mtimes(files):
+    result = {}
+    for f in files:
+        try:
+            result[f] = os.stat(f).st_mtime_ns
+        except FileNotFoundError:
+            result[f] = None
+    return result
+
+
+class Watcher:
+    """Polls the scene files and re-renders the scenes whose fingerprint changed."""
+
+    def __init__(self, paths=render_all.SCENE_FILES, quality="l", socket_path=render_daemon.SOCKET):
+        self.paths = paths
+        self.quality = quality
+        self.socket_path = socket_path
+        self.known = fingerprints(paths)
+        self.mtimes = _mtimes(watched_files(paths, self.known))
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._lock = threading.Lock()
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def poll(self):
+        """Check the files once; the scenes queued for rendering."""
+        mtimes = _mtimes(self.mtimes)
+        if mtimes == self.mtimes:
+            return []
+        start = time.perf_counter()
+        try:
+            current = fingerprints(self.paths)
+        except SyntaxError as e:
+            # Half-way through an edit; try again on the next save
+            print(f"{e.filename}:{e.lineno}: {e.msg}, waiting", flush=True)
+            self.mtimes = mtimes
+            return []
+
+        changed = [scene for scene, key in current.items() if self.known.get(scene) != key]
+        self.known = current
+        self.mtimes = _mtimes(watched_files(self.paths, current))
+        for scene in changed:
+            self.submit(scene)
+        names = ", ".join(scene for _, scene in changed) or "nothing"
+        print(f"changed: {names} ({(time.perf_counter() - start) * 1e3:.0f}ms)", flush=True)
+        return changed
+
+    def submit(self, job):
+        """Queue a (path, scene) for rendering, unless it is already waiting."""
+        with self._lock:
+            if job in self._queued:
+                return
+            self._queued.add(job)
+        self._queue.put(job)
+
+    def _render(self, path, scene):
+        try:
+            response = render_daemon.render(scene, self.quality, path, self.socket_path)
+        except OSError:
+            # No server running
+            report = render_all.render_all([(path, scene)], self.quality, workers=1)
+            entry = report["scenes"][0]
+            return entry["returncode"] == 0, entry.get("output") or "".join(entry.get("error", []))
+        return response["ok"], response.get("output") or response.get("error")
+
+    def _worker(self):
+        while True:
+            path, scene = self._queue.get()
+            with self._lock:
+                self._queued.discard((path, scene))
+            start = time.perf_counter()
+            ok, detail = self._render(path, scene)
+            status = "ok" if ok else "FAILED"
+            print(f"{scene}: {status} in {time.perf_counter() - start:.1f}s -> {detail}", flush=True)
+
+    def run(self, interval=POLL):
+        print(f"watching {len(self.mtimes)} files for {len(self.known)} scenes", flush=True)
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-render the scenes changed by each edit.")
+    parser.add_argument("files", nargs="*", default=render_all.SCENE_FILES,
+                        help=f"files with the scenes (default: {' '.join(render_all.SCENE_FILES)})")
+    parser.add_argument("-q", "--quality", choices=render_all.QUALITIES, default="l",
+                        help="manim quality (default: l, for previews)")
+    parser.add_argument("--socket", default=render_daemon.SOCKET, help="render server socket, used when listening")
+    parser.add_argument("--interval", type=float, default=POLL, help=f"seconds between checks (default: {POLL})")
+    args = parser.parse_args()
+
+    try:
+        Watcher(args.files, args.quality, args.socket).run(args.interval)
+    except KeyboardInterrupt:
+        pass